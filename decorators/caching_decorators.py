@@ -1,17 +1,48 @@
 import functools
 from decorators import count_calls
+from disk_cache import DiskStore, TieredStore
+from memo_cache import Memoizer, POLICIES, make_key
 
 
-def cache(func):
-    """Keep a cache of previous function calls"""
-    @functools.wraps(func)
-    def wrapper_cache(*args, **kwargs):
-        cache_key = args + tuple(kwargs.items())
-        if cache_key not in wrapper_cache.cache:
-            wrapper_cache.cache[cache_key] = func(*args, **kwargs)
-        return wrapper_cache.cache[cache_key]
-    wrapper_cache.cache = dict()
-    return wrapper_cache
+def cache(_func=None, *, maxsize=128, policy=None, ttl=None, maxbytes=None, path=None):
+    """Keep a bounded, thread-safe cache of previous function calls
+
+    policy -- 'lru' (the default), 'lfu' or 'ttl' (entries expire after `ttl` seconds);
+              giving a `ttl` selects 'ttl'
+    maxsize -- maximum number of entries, None for no limit
+    maxbytes -- optional memory budget measured with sys.getsizeof()
+    path -- optional SQLite file keeping the results across restarts
+    """
+    if policy is None:
+        policy = 'lru' if ttl is None else 'ttl'
+    if policy not in POLICIES:
+        raise ValueError(f'unknown policy {policy!r}, expected one of {sorted(POLICIES)}')
+    if ttl is not None and policy != 'ttl':
+        raise ValueError(f'ttl is only supported by the ttl policy, not {policy!r}')
+    store_kwargs = dict(maxsize=maxsize, maxbytes=maxbytes)
+    if policy == 'ttl':
+        store_kwargs['ttl'] = 60.0 if ttl is None else ttl
+
+    def decorator_cache(func):
+        store = POLICIES[policy](**store_kwargs)
+        if path is not None:
+            # the in-memory store stays in front of the slower disk tier
+            store = TieredStore(store, DiskStore(path, func))
+        memo = Memoizer(store)
+
+        @functools.wraps(func)
+        def wrapper_cache(*args, **kwargs):
+            return memo.lookup(make_key(args, kwargs), lambda: func(*args, **kwargs))
+        # same interface as functools.lru_cache
+        wrapper_cache.cache_info = memo.info
+        wrapper_cache.cache_clear = memo.clear
+        wrapper_cache.cache = memo.store
+        return wrapper_cache
+
+    if _func is None:
+        return decorator_cache
+    else:
+        return decorator_cache(_func)
 
 
 # @cache
@@ -31,6 +62,14 @@ def fibonacci(num):
     return fibonacci(num - 1) + fibonacci(num - 2)
 
 
+@cache(maxsize=4)
+def fibonacci_cached(num):
+    print(f"Calculating fibonacci_cached({num})")
+    if num < 2:
+        return num
+    return fibonacci_cached(num - 1) + fibonacci_cached(num - 2)
+
+
 def main():
     print(fibonacci(8))
 
@@ -40,6 +79,13 @@ def main():
 
     print(fibonacci.cache_info())
 
+    # our own cache reports the same statistics
+    print(fibonacci_cached(8))
+
+    print(fibonacci_cached(8))
+
+    print(fibonacci_cached.cache_info())
+
 
 if __name__ == '__main__':
     main()
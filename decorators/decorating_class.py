@@ -14,7 +14,7 @@ def main():
     tw = TimeWaster(1000)
     print('====')
     tw.waste_time(999)
-    print('Here, @timer only measures the time it takes to instantiate the class')
+    print('Here, @timer measures every public method, but not the instantiation')
 
 
 if __name__ == '__main__':
@@ -1,15 +1,17 @@
 import functools
 import time
 
+from instrumentation import REGISTRY, CallCounter
+from profiling import profile
+
 
 def count_calls(func):
-    @functools.wraps(func)
-    def wrapper_count_calls(*args, **kwargs):
-        wrapper_count_calls.num_calls += 1
-        print(f"Call {wrapper_count_calls.num_calls} of {func.__name__!r}")
-        return func(*args, **kwargs)
-    wrapper_count_calls.num_calls = 0
-    return wrapper_count_calls
+    """Count and print the calls of the decorated function
+
+    The count (num_calls) is kept per thread and summed when read.
+    Can be switched off at runtime with instrumentation.REGISTRY.
+    """
+    return CallCounter(func).instrument.current
 
 
 def do_twice(func):
@@ -30,23 +32,56 @@ def decorator(func):
     return wrapper_decorator
 
 
-def timer(func):
-    """Print the runtime of the decorated function"""
-    @functools.wraps(func)
-    def wrapper_timer(*args, **kwargs):
-        start_time = time.perf_counter()    # 1
-        value = func(*args, **kwargs)
-        end_time = time.perf_counter()      # 2
-        run_time = end_time - start_time    # 3
-        print(f"Finished {func.__name__!r} in {run_time:.4f} secs")
-        return value
-    return wrapper_timer
+def timer(_func=None, *, aggregate=False):
+    """Print the runtime of the decorated function
+
+    With aggregate=True the runtimes are collected in profiling.PROFILER
+    instead of printed. Decorating a class times all of its public methods.
+    """
+    def decorator_timer(func):
+        if isinstance(func, type):
+            return decorate_methods(func, decorator_timer)
+        if aggregate:
+            return profile(func)
+
+        @functools.wraps(func)
+        def wrapper_timer(*args, **kwargs):
+            start_time = time.perf_counter()    # 1
+            value = func(*args, **kwargs)
+            end_time = time.perf_counter()      # 2
+            run_time = end_time - start_time    # 3
+            print(f"Finished {func.__name__!r} in {run_time:.4f} secs")
+            return value
+        return wrapper_timer
+
+    if _func is None:
+        return decorator_timer
+    else:
+        return decorator_timer(_func)
+
+
+def decorate_methods(cls, decorator):
+    """Apply `decorator` to every public method defined in `cls`"""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_'):
+            continue
+        if isinstance(attr, (staticmethod, classmethod)):
+            setattr(cls, name, type(attr)(decorator(attr.__func__)))
+        elif callable(attr) and not isinstance(attr, type):
+            setattr(cls, name, decorator(attr))
+    return cls
 
 
 def debug(func):
-    """Print the function signature and return value"""
+    """Print the function signature and return value
+
+    Can be switched off at runtime with instrumentation.REGISTRY.
+    """
     @functools.wraps(func)
     def wrapper_debug(*args, **kwargs):
+        if not instrument.enabled:
+            # skip building the repr strings
+            return func(*args, **kwargs)
         args_repr = [repr(a) for a in args]                      # 1
         kwargs_repr = [f"{k}={v!r}" for k, v in kwargs.items()]  # 2
         signature = ", ".join(args_repr + kwargs_repr)           # 3
@@ -54,7 +89,8 @@ def debug(func):
         value = func(*args, **kwargs)
         print(f"{func.__name__!r} returned {value!r}")           # 4
         return value
-    return wrapper_debug
+    instrument = REGISTRY.register(func, wrapper_debug, 'debug')
+    return instrument.current
 
 
 def slow_down(func):
@@ -0,0 +1,132 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import types
+
+from memo_cache import MISSING
+
+
+def code_version(func):
+    """Fingerprint the code of `func` so a changed function never reads stale results"""
+    digest = hashlib.sha256()
+    digest.update(func.__qualname__.encode())
+    _hash_code(digest, func.__code__)
+    return digest.hexdigest()
+
+
+def _hash_code(digest, code):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        # the repr of a nested code object (genexpr, lambda, inner function)
+        # contains its memory address, which changes on every run
+        if isinstance(const, types.CodeType):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+class DiskStore:
+    """Cold tier: pickled results in a local SQLite file
+
+    Rows are keyed by function name and arguments and tagged with the
+    code version, so results survive restarts but not code changes.
+    """
+    def __init__(self, path, func):
+        self.path = path
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.version = code_version(func)
+        # one connection shared by all threads, serialized by the lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS memo ('
+                          'name TEXT, key BLOB, version TEXT, value BLOB, '
+                          'PRIMARY KEY (name, key))')
+        # results computed by an older version of the function are useless now
+        with self.conn:
+            self.conn.execute('DELETE FROM memo WHERE name = ? AND version != ?',
+                              (self.name, self.version))
+
+    @staticmethod
+    def _dump(obj):
+        """Pickle `obj`, or None if it cannot be pickled"""
+        try:
+            return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+
+    def _dump_key(self, key):
+        blob = self._dump(key)
+        return None if blob is None else hashlib.sha256(blob).digest()
+
+    def get(self, key):
+        key = self._dump_key(key)
+        if key is None:
+            # calls with unpicklable arguments are cached in memory only
+            return MISSING
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM memo WHERE name = ? AND key = ? AND version = ?',
+                                    (self.name, key, self.version)).fetchone()
+        if row is None:
+            return MISSING
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        key, blob = self._dump_key(key), self._dump(value)
+        if key is None or blob is None:
+            # keep unpicklable arguments and results in memory only
+            return
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)',
+                              (self.name, key, self.version, blob))
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM memo WHERE name = ?', (self.name,))
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM memo WHERE name = ?',
+                                     (self.name,)).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class TieredStore:
+    """Hot in-memory store in front of a cold disk store
+
+    get() and set() only touch the hot tier. The Memoizer calls load() and
+    save() for the cold tier without holding its lock, so one thread waiting
+    for the disk does not block the cache hits of all the others.
+    """
+    def __init__(self, hot, cold):
+        self.hot = hot
+        self.cold = cold
+        self.maxsize = hot.maxsize
+
+    def get(self, key):
+        return self.hot.get(key)
+
+    def set(self, key, value):
+        self.hot.set(key, value)
+
+    def load(self, key):
+        return self.cold.get(key)
+
+    def save(self, key, value):
+        self.cold.set(key, value)
+
+    def clear(self):
+        self.hot.clear()
+        self.cold.clear()
+
+    def __len__(self):
+        return len(self.hot)
+
+    def __contains__(self, key):
+        return self.get(key) is not MISSING or self.load(key) is not MISSING
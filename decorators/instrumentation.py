@@ -0,0 +1,165 @@
+import fnmatch
+import functools
+import sys
+import threading
+import types
+import weakref
+
+
+class ThreadCounter:
+    """Counter with one cell per thread, summed when it is read
+
+    Each thread only ever writes its own cell, so increment() needs no lock.
+    The cells of finished threads are folded into one retired total.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells = []   # (weak reference to the thread, cell)
+        self._retired = 0
+
+    def increment(self, n=1):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0]
+            with self._lock:
+                self._fold_finished()
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+        cell[0] += n
+
+    def _fold_finished(self):
+        live = []
+        for ref, cell in self._cells:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                self._retired += cell[0]
+            else:
+                live.append((ref, cell))
+        self._cells = live
+
+    @property
+    def value(self):
+        with self._lock:
+            self._fold_finished()
+            return self._retired + sum(cell[0] for _, cell in self._cells)
+
+    def __int__(self):
+        return self.value
+
+    def __str__(self):
+        return str(self.value)
+
+
+class Instrument:
+    """A registered decorator: the original function and its wrapper"""
+    def __init__(self, func, wrapper, kind):
+        self.func = func
+        self.wrapper = wrapper
+        self.kind = kind
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.enabled = True
+
+    @property
+    def current(self):
+        """What the decorated name should be bound to"""
+        return self.wrapper if self.enabled else self.func
+
+    def namespace(self):
+        """Find the module or class dict that holds the decorated name"""
+        owner = sys.modules.get(self.func.__module__)
+        *path, attr = self.func.__qualname__.split('.')
+        for part in path:
+            if owner is None or part == '<locals>':
+                return None, attr
+            owner = getattr(owner, part, None)
+        return owner, attr
+
+
+class Registry:
+    """Switch instrumentation on and off at runtime
+
+    Functions are selected by glob patterns on their qualified name
+    (e.g. 'simple_main.*') and optionally by decorator kind ('debug', 'count_calls').
+    Switching off rebinds the decorated name to the original function, so
+    disabled calls do not go through a wrapper at all. Code that kept a reference
+    to the wrapper still works: the wrapper then calls the function straight away.
+    """
+    def __init__(self):
+        self.instruments = []
+        # (pattern, kind, enabled), later rules win
+        self.rules = []
+        self._lock = threading.Lock()
+
+    def register(self, func, wrapper, kind):
+        instrument = Instrument(func, wrapper, kind)
+        with self._lock:
+            self.instruments.append(instrument)
+            for pattern, rule_kind, enabled in self.rules:
+                if self._matches(instrument, pattern, rule_kind):
+                    instrument.enabled = enabled
+        return instrument
+
+    @staticmethod
+    def _matches(instrument, pattern, kind):
+        return (kind is None or instrument.kind == kind) and fnmatch.fnmatchcase(instrument.name, pattern)
+
+    def _set(self, pattern, kind, enabled):
+        with self._lock:
+            self.rules.append((pattern, kind, enabled))
+            selected = [instrument for instrument in self.instruments
+                        if self._matches(instrument, pattern, kind)]
+        for instrument in selected:
+            instrument.enabled = enabled
+            self._rebind(instrument)
+        return [instrument.name for instrument in selected]
+
+    def enable(self, pattern='*', kind=None):
+        return self._set(pattern, kind, True)
+
+    def disable(self, pattern='*', kind=None):
+        return self._set(pattern, kind, False)
+
+    @staticmethod
+    def _rebind(instrument):
+        owner, attr = instrument.namespace()
+        if owner is None:
+            return
+        bound = getattr(owner, attr, None)
+        # leave the name alone if another decorator was stacked on top of ours
+        if bound is instrument.func or bound is instrument.wrapper:
+            setattr(owner, attr, instrument.current)
+
+    def status(self):
+        return {instrument.name: instrument.enabled for instrument in self.instruments}
+
+
+REGISTRY = Registry()
+
+
+class CallCounter:
+    """Wrapper of @count_calls: prints and counts the calls of `func`
+
+    `num_calls` is a plain int, like CountCalls.num_calls, but it is kept
+    per thread and summed when read, so counting needs no lock.
+    """
+    def __init__(self, func, registry=REGISTRY):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.calls = ThreadCounter()
+        self.instrument = registry.register(func, self, 'count_calls')
+
+    @property
+    def num_calls(self):
+        return self.calls.value
+
+    def __call__(self, *args, **kwargs):
+        if not self.instrument.enabled:
+            return self.func(*args, **kwargs)
+        self.calls.increment()
+        print(f"Call {self.num_calls} of {self.func.__name__!r}")
+        return self.func(*args, **kwargs)
+
+    def __get__(self, obj, objtype=None):
+        # bind like a function, so methods can be decorated too
+        return self if obj is None else types.MethodType(self, obj)
@@ -0,0 +1,293 @@
+import collections
+import sys
+import threading
+import time
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# sentinel returned by the stores when a key is not cached
+MISSING = object()
+# separates positional from keyword arguments inside a cache key
+_KWD_MARK = object()
+
+
+def make_key(args, kwargs):
+    """Build a hashable cache key that does not depend on keyword order"""
+    key = args
+    if kwargs:
+        # keyword names are unique, so sorting never has to compare the values
+        key += (_KWD_MARK,) + tuple(sorted(kwargs.items(), key=lambda item: item[0]))
+    return key
+
+
+class Store:
+    """Base class of the eviction policies
+
+    Subclasses decide which entry leaves the cache first.
+    The base class enforces the `maxsize` (number of entries)
+    and the optional `maxbytes` (approximate memory) budgets.
+    """
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=sys.getsizeof):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.sizes = {}
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        if key in self.sizes:
+            self.discard(key)
+        size = 0
+        if self.maxbytes is not None:
+            size = self.sizeof(value)
+            if size > self.maxbytes:
+                # would evict everything else and still not fit
+                return
+        if self.maxsize is not None and self.maxsize < 1:
+            return
+        # make room before inserting, so the new key is never its own victim
+        while self.maxsize is not None and len(self) >= self.maxsize:
+            self.discard(self._victim())
+        while self.maxbytes is not None and self.nbytes + size > self.maxbytes:
+            self.discard(self._victim())
+        self.sizes[key] = size
+        self.nbytes += size
+        self._insert(key, value)
+
+    def discard(self, key):
+        self.nbytes -= self.sizes.pop(key)
+        self._remove(key)
+
+    def clear(self):
+        self.nbytes = 0
+        self.sizes.clear()
+        self._clear()
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def __contains__(self, key):
+        return self.get(key) is not MISSING
+
+
+class LRUStore(Store):
+    """Evict the least recently used entry"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # keeps the keys ordered from the least to the most recently used
+        self.data = collections.OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key, MISSING)
+        if value is not MISSING:
+            self.data.move_to_end(key)
+        return value
+
+    def _insert(self, key, value):
+        self.data[key] = value
+
+    def _remove(self, key):
+        del self.data[key]
+
+    def _victim(self):
+        return next(iter(self.data))
+
+    def _clear(self):
+        self.data.clear()
+
+
+class LFUStore(Store):
+    """Evict the least frequently used entry, ties broken by recency
+
+    Keys are kept in buckets by their use count, so every operation is O(1).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.data = {}
+        self.counts = {}
+        self.buckets = collections.defaultdict(collections.OrderedDict)
+        self.min_count = 0
+
+    def get(self, key):
+        value = self.data.get(key, MISSING)
+        if value is not MISSING:
+            self._bump(key)
+        return value
+
+    def _bump(self, key):
+        count = self.counts[key]
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+            if self.min_count == count:
+                self.min_count = count + 1
+        self.counts[key] = count + 1
+        self.buckets[count + 1][key] = None
+
+    def _insert(self, key, value):
+        self.data[key] = value
+        self.counts[key] = 1
+        self.buckets[1][key] = None
+        self.min_count = 1
+
+    def _remove(self, key):
+        del self.data[key]
+        count = self.counts.pop(key)
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+            if self.min_count == count:
+                self.min_count = min(self.buckets, default=0)
+
+    def _victim(self):
+        return next(iter(self.buckets[self.min_count]))
+
+    def _clear(self):
+        self.data.clear()
+        self.counts.clear()
+        self.buckets.clear()
+        self.min_count = 0
+
+
+class TTLStore(Store):
+    """Expire entries `ttl` seconds after they were stored
+
+    All entries live equally long, so insertion order is also expiry order
+    and the oldest entry is evicted first when the cache is full.
+    """
+    def __init__(self, *args, ttl=60.0, clock=time.monotonic, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (expires_at, value)
+        self.data = collections.OrderedDict()
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            self.discard(key)
+            return MISSING
+        return value
+
+    def _insert(self, key, value):
+        self.data[key] = (self.clock() + self.ttl, value)
+        self._expire()
+
+    def _expire(self):
+        now = self.clock()
+        while self.data:
+            key, (expires_at, _) = next(iter(self.data.items()))
+            if expires_at > now:
+                break
+            self.discard(key)
+
+    def _remove(self, key):
+        del self.data[key]
+
+    def _victim(self):
+        return next(iter(self.data))
+
+    def _clear(self):
+        self.data.clear()
+
+
+POLICIES = {
+    'lru': LRUStore,
+    'lfu': LFUStore,
+    'ttl': TTLStore,
+}
+
+
+class _Call:
+    """A computation in progress that other threads can wait for"""
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Memoizer:
+    """Thread-safe front end of a store
+
+    Concurrent misses on the same key are de-duplicated (single flight):
+    the first thread computes the value while the others wait for it.
+    A store with a slow backing tier (like TieredStore) can also provide
+    load(key) and save(key, value): they are called without holding the lock.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, compute):
+        with self.lock:
+            value = self.store.get(key)
+            if value is not MISSING:
+                self.hits += 1
+                return value
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = _Call()
+            else:
+                self.misses += 1
+
+        if leader:
+            return self._lead(key, compute, call)
+        # a recursive call on the same key would wait for itself forever
+        if call.owner == threading.get_ident():
+            return compute()
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def _lead(self, key, compute, call):
+        load = getattr(self.store, 'load', None)
+        save = getattr(self.store, 'save', None)
+        try:
+            value = MISSING if load is None else load(key)
+            with self.lock:
+                if value is MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    # promote into the in-memory tier
+                    self.store.set(key, value)
+            if value is MISSING:
+                value = compute()
+                with self.lock:
+                    self.store.set(key, value)
+                if save is not None:
+                    save(key, value)
+            call.value = value
+            return value
+        except BaseException as e:
+            # errors are handed to the waiting threads but never cached
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.store.maxsize, len(self.store))
+
+    def clear(self):
+        with self.lock:
+            self.store.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,189 @@
+import functools
+import json
+import math
+import threading
+import time
+import weakref
+
+
+# Every power of two is split into SUB_BUCKETS linear buckets,
+# which keeps the relative error of the percentiles around 6%.
+SUB_BUCKETS = 8
+EXPONENTS = 64
+NUM_BUCKETS = SUB_BUCKETS * EXPONENTS
+
+
+def bucket_index(ns):
+    """Map a duration in nanoseconds to its histogram bucket"""
+    if ns <= 0:
+        return 0
+    mantissa, exponent = math.frexp(ns)   # ns == mantissa * 2**exponent, 0.5 <= mantissa < 1
+    return min(exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS), NUM_BUCKETS - 1)
+
+
+def bucket_value(index):
+    """Middle of the duration range covered by bucket `index`"""
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub + 0.5) / (2 * SUB_BUCKETS), exponent)
+
+
+class Histogram:
+    """Fixed-size latency histogram owned by a single thread"""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.buckets[bucket_index(ns)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                # never report a value outside the observed range
+                return min(max(bucket_value(index), self.min), self.max)
+        return float(self.max)
+
+
+class FunctionStats:
+    """Statistics for one function, recorded per thread and merged on read
+
+    Threads never share a histogram, so recording needs no lock.
+    The histograms of finished threads are folded into one retired histogram,
+    so memory stays bounded by the number of live threads.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._histograms = []   # (weak reference to the thread, histogram)
+        self._retired = Histogram()
+
+    def _histogram(self):
+        histogram = Histogram()
+        self._local.histogram = histogram
+        with self._lock:
+            self._fold_finished()
+            self._histograms.append((weakref.ref(threading.current_thread()), histogram))
+        return histogram
+
+    def _fold_finished(self):
+        # a finished thread records nothing more, so its histogram can be merged safely
+        live = []
+        for ref, histogram in self._histograms:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                self._retired.merge(histogram)
+            else:
+                live.append((ref, histogram))
+        self._histograms = live
+
+    def record(self, ns):
+        try:
+            histogram = self._local.histogram
+        except AttributeError:
+            histogram = self._histogram()
+        histogram.add(ns)
+
+    def merged(self):
+        total = Histogram()
+        with self._lock:
+            self._fold_finished()
+            total.merge(self._retired)
+            histograms = [histogram for _, histogram in self._histograms]
+        for histogram in histograms:
+            total.merge(histogram)
+        return total
+
+    def snapshot(self):
+        h = self.merged()
+        return {
+            'calls': h.count,
+            'total_secs': h.total / 1e9,
+            'min_secs': (h.min or 0) / 1e9,
+            'max_secs': h.max / 1e9,
+            'p50_secs': h.percentile(50) / 1e9,
+            'p95_secs': h.percentile(95) / 1e9,
+            'p99_secs': h.percentile(99) / 1e9,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms = []
+            self._retired = Histogram()
+            self._local = threading.local()
+
+
+class Profiler:
+    """Collects the timings of every function decorated with @profile"""
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.functions = {}
+
+    def stats_for(self, func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        if name not in self.functions:
+            self.functions[name] = FunctionStats(name)
+        return self.functions[name]
+
+    def snapshot(self):
+        return {name: stats.snapshot() for name, stats in self.functions.items()}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def report(self):
+        lines = [f"{'function':<40} {'calls':>8} {'total':>10} {'min':>10} "
+                 f"{'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}"]
+        for name, s in sorted(self.snapshot().items(), key=lambda item: -item[1]['total_secs']):
+            lines.append(f"{name:<40} {s['calls']:>8} {s['total_secs']:>10.4f} {s['min_secs']:>10.6f} "
+                         f"{s['p50_secs']:>10.6f} {s['p95_secs']:>10.6f} {s['p99_secs']:>10.6f} "
+                         f"{s['max_secs']:>10.6f}")
+        return '\n'.join(lines)
+
+    def reset(self):
+        for stats in self.functions.values():
+            stats.reset()
+
+
+PROFILER = Profiler()
+
+
+def profile(func, profiler=PROFILER):
+    """Record the runtime of the decorated function in `profiler` instead of printing it"""
+    record = profiler.stats_for(func).record
+    clock = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper_profile(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(clock() - start)
+    return wrapper_profile
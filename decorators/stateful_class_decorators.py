@@ -1,4 +1,5 @@
 import functools
+from instrumentation import REGISTRY, ThreadCounter
 
 
 class CountCalls:
@@ -6,13 +7,20 @@ class CountCalls:
         # use update_wrapper instead wraps
         functools.update_wrapper(self, func)
         self.func = func
-        self.num_calls = 0
+        self.calls = ThreadCounter()
+        self.instrument = REGISTRY.register(func, self, 'count_calls')
+
+    @property
+    def num_calls(self):
+        return self.calls.value
 
     # The .__call__() method is executed each time you try to call an instance of the class
     # The .__call__() method will be called instead of the decorated function.
     # It does essentially the same thing as the wrapper() function in our earlier examples.
     def __call__(self, *args, **kwargs):
-        self.num_calls += 1
+        if not self.instrument.enabled:
+            return self.func(*args, **kwargs)
+        self.calls.increment()
         print(f'Call {self.num_calls} of {self.func.__name__!r}')
         return self.func(*args, **kwargs)
 
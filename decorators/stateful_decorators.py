@@ -1,14 +1,10 @@
-import functools
+from instrumentation import REGISTRY, CallCounter
 
 
 def count_calls(func):
-    @functools.wraps(func)
-    def wrapper_count_calls(*args, **kwargs):
-        wrapper_count_calls.num_calls += 1
-        print(f"Call {wrapper_count_calls.num_calls} of {func.__name__!r}")
-        return func(*args, **kwargs)
-    wrapper_count_calls.num_calls = 0
-    return wrapper_count_calls
+    # the wrapper keeps the state: one counter per thread, summed when num_calls is read,
+    # and the registry can switch the counting off at runtime
+    return CallCounter(func).instrument.current
 
 
 @count_calls
@@ -23,6 +19,10 @@ def main():
 
     print(say_whee.num_calls)
 
+    # switched off, say_whee is the original function again
+    REGISTRY.disable('*.say_whee')
+    say_whee()
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,187 @@
+import asyncio
+import csv
+import sys
+import time
+
+
+# Async generator versions of the stages in data_pipeline.main().
+# They can be chained with `async for` exactly like the generator expressions.
+
+async def read_lines(reader, encoding='utf-8'):
+    """Lines from an asyncio.StreamReader (a socket or a subprocess pipe)"""
+    async for line in reader:
+        yield line.decode(encoding)
+
+
+async def split_lines(lines):
+    # one csv.reader per line is fine as long as fields contain no newlines
+    async for line in lines:
+        yield next(csv.reader([line]))
+
+
+async def to_dicts(rows):
+    # the first row holds the column names
+    cols = None
+    async for data in rows:
+        if cols is None:
+            cols = data
+            continue
+        yield dict(zip(cols, data))
+
+
+async def where(dicts, column, value):
+    async for d in dicts:
+        if d[column] == value:
+            yield d
+
+
+async def total(dicts, column, convert=int):
+    result = 0
+    async for d in dicts:
+        result += convert(d[column])
+    return result
+
+
+def parse_batch(lines):
+    """CPU-heavy stage: parse a batch of lines at once (runs in an executor)"""
+    return list(csv.reader(lines))
+
+
+async def in_executor(items, func, batch_size=1000, executor=None):
+    """Apply `func` to batches of items in an executor and yield the results
+
+    Batching amortizes the cost of the hand-off to the executor thread or process.
+    """
+    loop = asyncio.get_running_loop()
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            for result in await loop.run_in_executor(executor, func, batch):
+                yield result
+            batch = []
+    if batch:
+        for result in await loop.run_in_executor(executor, func, batch):
+            yield result
+
+
+class StageStats:
+    """Counters of one buffered stage"""
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.started = None
+        self.finished = None
+        self.blocked = 0.   # producer waiting for a full queue: downstream is the bottleneck
+        self.starved = 0.   # consumer waiting for an empty queue: upstream is the bottleneck
+        self.latency = 0.   # total time items spent in the queue
+        self.max_depth = 0
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self):
+        return self.items / self.elapsed if self.elapsed else 0.
+
+    def __str__(self):
+        return ('{0.name:<12} {0.items:>9} items {0.throughput:>11.0f}/s '
+                'latency {1:.6f}s blocked {0.blocked:.3f}s starved {0.starved:.3f}s '
+                'max depth {0.max_depth}').format(self, self.latency / self.items if self.items else 0.)
+
+
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception of the producer over to the consumer"""
+    def __init__(self, error):
+        self.error = error
+
+
+async def buffered(items, maxsize=100, stats=None):
+    """Run the stage producing `items` in its own task, behind a bounded queue
+
+    The producer can run ahead of the consumer by at most `maxsize` items;
+    after that it waits (backpressure) instead of buffering without limit.
+    """
+    stats = stats or StageStats('stage')
+    queue = asyncio.Queue(maxsize)
+    clock = time.perf_counter
+
+    async def produce():
+        try:
+            async for item in items:
+                start = clock()
+                await queue.put((start, item))
+                stats.blocked += clock() - start
+                stats.max_depth = max(stats.max_depth, queue.qsize())
+        except Exception as e:
+            await queue.put((clock(), _Failure(e)))
+            return
+        await queue.put((clock(), _DONE))
+
+    stats.started = clock()
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            start = clock()
+            enqueued, item = await queue.get()
+            now = clock()
+            stats.starved += now - start
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            stats.items += 1
+            stats.latency += now - enqueued
+            yield item
+    finally:
+        stats.finished = clock()
+        producer.cancel()
+
+
+async def series_a_total(reader, maxsize=100, cpu_executor=None):
+    """Sum the series A funding of one CSV feed; returns (total, stage stats)"""
+    stats = [StageStats(name) for name in ('read', 'split', 'to_dicts', 'filter')]
+    lines = buffered(read_lines(reader), maxsize, stats[0])
+    if cpu_executor is None:
+        rows = split_lines(lines)
+    else:
+        # hand the parsing to a thread or process pool in batches
+        rows = in_executor(lines, parse_batch, executor=cpu_executor)
+    rows = buffered(rows, maxsize, stats[1])
+    dicts = buffered(to_dicts(rows), maxsize, stats[2])
+    funding = buffered(where(dicts, 'round', 'a'), maxsize, stats[3])
+    return await total(funding, 'raisedAmt'), stats
+
+
+async def feed(file_name, repeat):
+    """A subprocess writing `file_name` to its stdout, standing in for a network feed"""
+    script = ('import sys\n'
+              # every line ends with a newline, also the last one of the file
+              'data = [line + "\\n" for line in open(sys.argv[1]).read().splitlines()]\n'
+              'sys.stdout.write(data[0])\n'
+              'for _ in range(int(sys.argv[2])):\n'
+              '    sys.stdout.writelines(data[1:])\n')
+    return await asyncio.create_subprocess_exec(sys.executable, '-c', script, file_name, str(repeat),
+                                                stdout=asyncio.subprocess.PIPE)
+
+
+async def main():
+    # several feeds ingested concurrently by one process, without a thread per feed
+    processes = [await feed('data.csv', 10000) for _ in range(4)]
+    results = await asyncio.gather(*(series_a_total(process.stdout) for process in processes))
+    for process in processes:
+        await process.wait()
+    for n, (result, stats) in enumerate(results):
+        print(f'feed {n}: {result}')
+        for stage in stats:
+            print('    ', stage)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
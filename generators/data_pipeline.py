@@ -1,20 +1,30 @@
+from pipeline import Pipeline
+
+
 def main():
     file_name = 'data.csv'
-    lines = (line for line in open(file_name))
-    list_line = (s.rstrip().split(",") for s in lines)
-    # uses next() to store the column names in a list.
-    cols = next(list_line)
-    company_dicts = (dict(zip(cols, data)) for data in list_line)
-    funding = (
-        int(company_dict["raisedAmt"])
-        for company_dict in company_dicts
-        if company_dict["round"] == "a"
-    )
-    # iteration works only here
-    #  begins the iteration process by calling sum()
-    total_series_a = sum(funding)
+    # the with statement closes the file once sum() has consumed the generators
+    with open(file_name) as infile:
+        lines = (line for line in infile)
+        list_line = (s.rstrip().split(",") for s in lines)
+        # uses next() to store the column names in a list.
+        cols = next(list_line)
+        company_dicts = (dict(zip(cols, data)) for data in list_line)
+        funding = (
+            int(company_dict["raisedAmt"])
+            for company_dict in company_dicts
+            if company_dict["round"] == "a"
+        )
+        # iteration works only here
+        #  begins the iteration process by calling sum()
+        total_series_a = sum(funding)
     print(total_series_a)
 
+    # The same query with the pipeline library: quoted fields are parsed correctly,
+    # the file is read in large blocks and only the needed columns are picked out.
+    series_a = Pipeline(file_name).where_equals('round', 'a').select('raisedAmt', convert=int)
+    print(series_a.sum('raisedAmt'))
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,108 @@
+from concurrent.futures import ProcessPoolExecutor
+import codecs
+import csv
+import functools
+import os
+import tempfile
+import time
+
+from pipeline import Pipeline, Source, Sum, make_sample
+
+
+class ByteRange(Source):
+    """Read only the bytes [start, stop) of a file; both ends are on line boundaries"""
+    def __init__(self, path, start, stop, chunk_size=1 << 20, encoding='utf-8'):
+        super().__init__(path, chunk_size, encoding)
+        self.start = start
+        self.stop = stop
+
+    def texts(self):
+        # an incremental decoder copes with multi-byte characters split between reads
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        with open(self.path, 'rb') as infile:
+            infile.seek(self.start)
+            remaining = self.stop - self.start
+            while remaining > 0:
+                data = infile.read(min(self.chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield decoder.decode(data, final=remaining <= 0)
+
+
+def read_header(path, encoding='utf-8'):
+    """Return the parsed header line and the offset of the first data byte"""
+    with open(path, 'rb') as infile:
+        line = infile.readline()
+    return next(csv.reader([line.decode(encoding)])), len(line)
+
+
+def split_ranges(path, parts, start=0):
+    """Split the bytes from `start` to the end of the file into `parts` ranges
+
+    Every boundary is moved forward to the start of the next line.
+    Records must not contain newlines inside quoted fields.
+    """
+    size = os.path.getsize(path)
+    boundaries = [start]
+    with open(path, 'rb') as infile:
+        for i in range(1, parts):
+            offset = start + (size - start) * i // parts
+            # from the byte before the offset, so a line starting exactly there is kept whole
+            infile.seek(max(offset - 1, start))
+            infile.readline()
+            boundaries.append(min(infile.tell(), size))
+    boundaries.append(size)
+    boundaries = sorted(set(boundaries))
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _aggregate_range(pipeline, aggregate, header, start, stop):
+    """Worker: run the pipeline over one byte range and return the partial aggregate"""
+    source = ByteRange(pipeline.source.path, start, stop,
+                       pipeline.source.chunk_size, pipeline.source.encoding)
+    blocks = source.blocks()
+    try:
+        return aggregate.reduce(pipeline.execute(Source.lines(blocks), header))
+    finally:
+        blocks.close()
+
+
+def aggregate_parallel(pipeline, aggregate, workers=None, chunks=None):
+    """Like pipeline.aggregate(aggregate), with the file split across a process pool
+
+    Each worker parses, filters and reduces its own byte range, and the parent
+    merges the partial results with aggregate.merge(). Filters, converters and
+    aggregates are sent to the workers, so they must be picklable
+    (module level functions, not lambdas).
+    """
+    workers = workers or os.cpu_count() or 1
+    pipeline = pipeline.for_aggregate(aggregate)
+    header, data_start = read_header(pipeline.source.path, pipeline.source.encoding)
+    ranges = split_ranges(pipeline.source.path, chunks or workers * 4, data_start)
+    task = functools.partial(_aggregate_range, pipeline, aggregate, header)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = list(executor.map(task, *zip(*ranges))) if ranges else []
+    return functools.reduce(aggregate.merge, partials, aggregate.reduce(()))
+
+
+def main():
+    series_a = Pipeline('data.csv').where_equals('round', 'a').select('raisedAmt', convert=int)
+    print(aggregate_parallel(series_a, Sum('raisedAmt'), workers=2))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'funding.csv')
+        make_sample(path, 2000000)
+        series_a = Pipeline(path).where_equals('round', 'a').select('raisedAmt', convert=int)
+        for workers in [None] + sorted({1, 2, 4, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            if workers is None:
+                total = series_a.sum('raisedAmt')
+            else:
+                total = aggregate_parallel(series_a, Sum('raisedAmt'), workers=workers)
+            print('{:<10} {} {:.2f} secs'.format(
+                'serial' if workers is None else f'{workers} workers', total, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,9 @@
+try:
+    import numpy as np
+except ImportError:  # palindrome_mask() falls back to is_palindrome()
+    np = None
+
+
 def is_palindrome(num):
     # Skip single-digit inputs
     if num // 10 == 0:
@@ -15,6 +21,47 @@ def is_palindrome(num):
         return False
 
 
+def palindrome_mask(nums, chunk_size=1 << 20):
+    """is_palindrome() for every number of `nums` at once, as a boolean array
+
+    `nums` is a range or an array of integers that fit in an int64.
+    The digits are reversed for a whole chunk of numbers per NumPy operation;
+    working in chunks keeps the temporary arrays small.
+    """
+    if np is None:
+        return [is_palindrome(num) for num in nums]
+    chunks = []
+    for start in range(0, len(nums), chunk_size):
+        chunk = nums[start:start + chunk_size]
+        if isinstance(chunk, range):
+            chunk = np.arange(chunk.start, chunk.stop, chunk.step, dtype=np.int64)
+        chunks.append(_palindrome_chunk(np.asarray(chunk, dtype=np.int64)))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=bool)
+
+
+def _palindrome_chunk(nums):
+    # uint64 holds the reverse of any non-negative int64 without overflowing
+    temp = np.where(nums > 0, nums, 0).astype(np.uint64)
+    reversed_nums = np.zeros_like(temp)
+    while temp.any():
+        # numbers that ran out of digits keep their reverse
+        active = temp > 0
+        temp, digit = np.divmod(temp, np.uint64(10))
+        reversed_nums = np.where(active, reversed_nums * np.uint64(10) + digit, reversed_nums)
+    # skip single-digit inputs, like is_palindrome(); negative numbers are never palindromes
+    return (nums >= 10) & (reversed_nums == nums.astype(np.uint64))
+
+
+def find_palindromes(nums, chunk_size=1 << 20):
+    """The palindromes among `nums`"""
+    mask = palindrome_mask(nums, chunk_size)
+    if np is None:
+        return [num for num, is_pal in zip(nums, mask) if is_pal]
+    if isinstance(nums, range):
+        return np.flatnonzero(mask) * nums.step + nums.start
+    return np.asarray(nums)[mask]
+
+
 def infinite_palindromes():
     num = 0
     while True:
@@ -31,6 +78,69 @@ def infinite_palindromes():
         num += 1
 
 
+# Building palindromes instead of testing every integer:
+# a palindrome is fixed by the first half of its digits, e.g. 123 -> 12321 or 123321.
+# Counting up the first half visits only palindromes, in increasing order.
+
+def mirror(half, length):
+    """The palindrome with `length` digits whose first half is `half`"""
+    digits = str(half)
+    return int(digits + digits[::-1][length % 2:])
+
+
+class Palindromes:
+    """Iterator over the palindromes >= 10, like infinite_palindromes()
+
+    .send(num) seeks in O(digits): the next value is the first palindrome after num.
+    The position is just (half, length), so state() can be saved and restored.
+    """
+    def __init__(self, start=10, half=None, length=None):
+        if half is None:
+            self.seek(start)
+        else:
+            self.half, self.length = half, length
+
+    def seek(self, num):
+        """Move to the smallest palindrome >= num"""
+        num = max(num, 10)  # single-digit numbers are skipped, as in is_palindrome()
+        digits = str(num)
+        self.length = len(digits)
+        self.half = int(digits[:(self.length + 1) // 2])
+        if mirror(self.half, self.length) < num:
+            self._advance()
+
+    def _advance(self):
+        self.half += 1
+        if self.half == 10 ** ((self.length + 1) // 2):
+            # 99 -> 101, 999 -> 1001: one more digit
+            self.length += 1
+            self.half = 10 ** ((self.length + 1) // 2 - 1)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = mirror(self.half, self.length)
+        self._advance()
+        return value
+
+    def send(self, num):
+        if num is not None:
+            self.seek(num + 1)
+        return next(self)
+
+    def batch(self, n):
+        """The next n palindromes as a list"""
+        return [next(self) for _ in range(n)]
+
+    def state(self):
+        return {'half': self.half, 'length': self.length}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(half=state['half'], length=state['length'])
+
+
 def main():
     #  yields a value once a palindrome is found
     pal_gen = infinite_palindromes()
@@ -39,6 +149,23 @@ def main():
         # brings execution back into the generator logic and assigns 10 ** digits to i
         pal_gen.send(10 ** (digits))
         print(i)
+        if digits == 6:
+            # scanning every integer gets too slow beyond this
+            break
+
+    # the same loop on constructed palindromes is instant even for 10 ** 15
+    pal_gen = Palindromes()
+    for i in pal_gen:
+        digits = len(str(i))
+        pal_gen.send(10 ** (digits))
+        print(i)
+        if digits == 16:
+            break
+
+    print(Palindromes(start=10 ** 15).batch(5))
+
+    # testing a whole range at once
+    print(len(find_palindromes(range(10 ** 7))))
 
 
 if __name__ == '__main__':
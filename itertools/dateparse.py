@@ -0,0 +1,82 @@
+# Fast parsers for the fixed date and time formats of our CSV files.
+# datetime.strptime() interprets the format string on every call, which makes it
+# the most expensive part of loading SP500.csv and swimmers.csv.
+# Here the fields are sliced out directly, repeated strings are answered from a cache
+# and whole columns can be converted at once.
+from datetime import date, datetime, time
+import functools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _digits(text):
+    # int() would also accept signs, spaces and non-ASCII digits, strptime does not
+    return text.isascii() and text.isdigit()
+
+
+def _is_iso_date(text):
+    return (len(text) == 10 and text[4] == '-' and text[7] == '-'
+            and _digits(text[:4]) and _digits(text[5:7]) and _digits(text[8:]))
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_date(text):
+    """Same as datetime.strptime(text, '%Y-%m-%d').date()"""
+    if _is_iso_date(text):
+        try:
+            return date(int(text[:4]), int(text[5:7]), int(text[8:]))
+        except ValueError:
+            pass
+    # anything unusual gets the exact behavior (and error message) of strptime
+    return datetime.strptime(text, '%Y-%m-%d').date()
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_time(text):
+    """Same as datetime.strptime(text, '%M:%S:%f').time()"""
+    if (8 <= len(text) <= 12 and text[2] == ':' and text[5] == ':'
+            and _digits(text[:2]) and _digits(text[3:5]) and _digits(text[6:])):
+        try:
+            # %f accepts 1 to 6 digits and pads them on the right
+            return time(0, int(text[:2]), int(text[3:5]), int(text[6:].ljust(6, '0')))
+        except ValueError:
+            pass
+    return datetime.strptime(text, '%M:%S:%f').time()
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_micros(text):
+    """A '%M:%S:%f' string as an integer number of microseconds"""
+    t = parse_time(text)
+    return (t.minute * 60 + t.second) * 1000000 + t.microsecond
+
+
+def parse_dates(column):
+    """Parse a whole column of '%Y-%m-%d' strings into a list of dates"""
+    column = list(column)
+    # NumPy would also accept other forms like '2020-01' or '+202-01-01', strptime does not
+    if np is not None and all(map(_is_iso_date, column)):
+        try:
+            # NumPy converts the whole column in C; tolist() turns datetime64[D] into dates
+            dates = np.array(column, dtype='datetime64[D]').tolist()
+        except ValueError:
+            pass
+        else:
+            # year 0 is valid for NumPy, it comes back as an int instead of a date
+            if all(type(day) is date for day in dates):
+                return dates
+    return _parse_unique(column, parse_date)
+
+
+def parse_times(column):
+    """Parse a whole column of '%M:%S:%f' strings into a list of times"""
+    return _parse_unique(list(column), parse_time)
+
+
+def _parse_unique(column, parse):
+    # every distinct string is parsed only once
+    parsed = {text: parse(text) for text in set(column)}
+    return [parsed[text] for text in column]
@@ -0,0 +1,173 @@
+import itertools as it
+import random
+import time
+
+import cards
+
+try:
+    import numpy as np
+except ImportError:  # the batch functions fall back to one bytearray per deck
+    np = None
+
+
+RANKS = ['A', 'K', 'Q', 'J', '10', '9', '8', '7', '6', '5', '4', '3', '2']
+SUITS = ['♥', '♦', '♣', '♠']
+
+# A card is encoded as its index in the deck of cards.main(): rank * 4 + suit.
+# Every code fits in a byte, so a deck is a 52 byte bytearray (or a row of a uint8 array).
+CARDS = tuple(it.product(RANKS, SUITS))
+CODES = {card: code for code, card in enumerate(CARDS)}
+DECK_SIZE = len(CARDS)
+
+
+def encode(card):
+    return CODES[card]
+
+
+def decode(code):
+    return CARDS[code]
+
+
+def rank(code):
+    """0 for an ace, 12 for a two"""
+    return code >> 2
+
+
+def suit(code):
+    return code & 3
+
+
+class Deck:
+    """A deck of card codes in a bytearray, shuffled, cut and dealt in place
+
+    Dealing does not remove cards, it moves `top` past them, so a Deck can be
+    reused for the next round with reset() instead of being rebuilt.
+    """
+    def __init__(self, codes=range(DECK_SIZE), rng=random):
+        self.cards = bytearray(codes)
+        self.top = 0
+        self.random = rng.random
+
+    def reset(self):
+        self.top = 0
+        return self
+
+    def shuffle(self, count=None):
+        """Shuffle the cards left in the deck
+
+        With `count`, only the first `count` cards are drawn (a partial
+        Fisher-Yates shuffle): they are a uniform random sample, and dealing
+        a few hands costs `count` swaps instead of 51.
+        """
+        cards, rand, top = self.cards, self.random, self.top
+        n = len(cards)
+        stop = n - 1 if count is None else min(top + count, n - 1)
+        for i in range(top, stop):
+            j = i + int(rand() * (n - i))
+            cards[i], cards[j] = cards[j], cards[i]
+        return self
+
+    def cut(self, n):
+        """Cut the cards left in the deck at index `n`"""
+        if n < 0:
+            raise ValueError('`n` must be a non-negative integer')
+        top, cards = self.top, self.cards
+        cards[top:] = cards[top + n:] + cards[top:top + n]
+        return self
+
+    def deal(self, num_hands=1, hand_size=5):
+        """Same hands as cards.deal(), as bytes of card codes"""
+        top, stop = self.top, self.top + num_hands * hand_size
+        if stop > len(self.cards):
+            raise ValueError(f'{len(self)} cards left, cannot deal {num_hands} hands of {hand_size}')
+        self.top = stop
+        # cards.deal() deals one card to every hand in turn, so hand h gets every num_hands-th card
+        return tuple(bytes(self.cards[top + h:stop:num_hands]) for h in range(num_hands))
+
+    def __len__(self):
+        return len(self.cards) - self.top
+
+    def __iter__(self):
+        return map(decode, self.cards[self.top:])
+
+
+# Batches: one deck per row of a (decks, 52) uint8 array
+
+def shuffled_decks(decks, rng=None):
+    """`decks` independently shuffled decks
+
+    `rng` is a numpy.random.Generator or a seed (random.Random without NumPy).
+    """
+    if np is None:
+        rng = rng if isinstance(rng, random.Random) else random.Random(rng)
+        return [Deck(rng=rng).shuffle().cards for _ in range(decks)]
+    rng = np.random.default_rng(rng)
+    batch = np.tile(np.arange(DECK_SIZE, dtype=np.uint8), (decks, 1))
+    return rng.permuted(batch, axis=1, out=batch)
+
+
+def cut_decks(batch, n):
+    """Cut every deck at `n`, an int or one position per deck, in place"""
+    positions = [n] if isinstance(n, int) else n
+    if any(at < 0 for at in positions):
+        raise ValueError('`n` must be a non-negative integer')
+    if np is None:
+        for cards, at in zip(batch, [n] * len(batch) if isinstance(n, int) else n):
+            cards[:] = cards[at:] + cards[:at]
+        return batch
+    n = np.asarray(n)
+    # like cards.cut(), cutting at or past the bottom leaves the deck as it is
+    n = np.minimum(n, DECK_SIZE)
+    columns = (np.arange(DECK_SIZE) + n[..., None]) % DECK_SIZE
+    batch[:] = np.take_along_axis(batch, np.broadcast_to(columns, batch.shape), axis=1)
+    return batch
+
+
+def deal_decks(batch, num_hands=1, hand_size=5):
+    """Deal every deck like cards.deal(): an array of shape (decks, num_hands, hand_size)"""
+    if num_hands * hand_size > DECK_SIZE:
+        raise ValueError(f'cannot deal {num_hands} hands of {hand_size} from one deck')
+    if np is None:
+        return [Deck(cards).deal(num_hands, hand_size) for cards in batch]
+    # column of card k of hand h: k * num_hands + h
+    columns = np.arange(hand_size) * num_hands + np.arange(num_hands)[:, None]
+    return batch[:, columns]
+
+
+def deal_batches(deals, num_hands=1, hand_size=5, batch_size=100000, rng=None):
+    """Yield the hands of `deals` independent shuffled decks, `batch_size` decks at a time"""
+    rng = np.random.default_rng(rng) if np is not None else random.Random(rng)
+    for start in range(0, deals, batch_size):
+        batch = shuffled_decks(min(batch_size, deals - start), rng)
+        yield deal_decks(batch, num_hands, hand_size)
+
+
+def main():
+    # the same hands as cards.py, from the same order of cards
+    ordered = list(it.product(RANKS, SUITS))
+    assert Deck().cut(26).deal(3) == tuple(
+        bytes(map(encode, hand)) for hand in cards.deal(cards.cut(ordered, 26), 3))
+    hand, = Deck().shuffle().deal()
+    print([decode(code) for code in hand])
+
+    rounds = 100000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        cards.deal(cards.cut(cards.shuffle(ordered), 26), num_hands=3)
+    print('cards.py:     {:8.0f} deals/s'.format(rounds / (time.perf_counter() - start)))
+
+    deck = Deck()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        deck.reset().shuffle(15).deal(num_hands=3)
+    print('Deck:         {:8.0f} deals/s'.format(rounds / (time.perf_counter() - start)))
+
+    deals = 10 ** 6
+    start = time.perf_counter()
+    for hands in deal_batches(deals, num_hands=3):
+        pass
+    print('deal_batches: {:8.0f} deals/s'.format(deals / (time.perf_counter() - start)))
+
+
+if __name__ == '__main__':
+    main()
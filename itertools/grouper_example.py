@@ -1,4 +1,12 @@
+from array import array
 import itertools as it
+import time
+import tracemalloc
+
+try:
+    import numpy as np
+except ImportError:  # array_grouper() falls back to memoryview_grouper()
+    np = None
 
 
 def naive_grouper(inputs, n):
@@ -19,6 +27,64 @@ def grouper(inputs, n, fillvalue=None):
     return it.zip_longest(*iters, fillvalue=fillvalue)
 
 
+# Working with buffers (bytes, bytearray, array.array, mmap)
+def memoryview_grouper(inputs, n):
+    """Yield records of `n` items as memoryview slices of `inputs`, without copying
+
+    Like better_grouper() an incomplete last record is dropped. The slices
+    share the memory of `inputs`: convert a record with bytes() or tolist()
+    to keep it, and release the slices before closing an mmap.
+    """
+    view = memoryview(inputs)
+    if view.ndim != 1:
+        # flatten, keeping the item type so that a record still holds `n` items
+        view = view.cast('B').cast(view.format)
+    for start in range(0, len(view) - n + 1, n):
+        yield view[start:start + n]
+
+
+def array_grouper(inputs, n, dtype=None):
+    """All complete records of `n` items as the rows of a 2-D NumPy view of `inputs`
+
+    `dtype` defaults to the item type of the buffer (bytes for bytes, 'd' for array('d')).
+    Nothing is copied: the rows are read-only if `inputs` is.
+    """
+    if np is None:
+        return list(memoryview_grouper(inputs, n))
+    items = np.frombuffer(inputs, dtype=dtype or memoryview(inputs).format)
+    return items[:len(items) // n * n].reshape(-1, n)
+
+
+def count_groups(groups):
+    return sum(1 for _ in groups)
+
+
+def benchmark(size=16 * 2**20, n=64):
+    """Time and peak memory of grouping `size` bytes into records of `n` bytes
+
+    The default is small enough for naive_grouper(), which keeps every record
+    as a tuple; the buffer groupers also run in constant memory on a 1 GB input (size=2**30).
+    """
+    inputs = bytes(range(256)) * (size // 256)
+    groupers = [
+        ('naive_grouper', lambda: count_groups(naive_grouper(inputs, n))),
+        ('better_grouper', lambda: count_groups(better_grouper(inputs, n))),
+        ('grouper', lambda: count_groups(grouper(inputs, n))),
+        ('memoryview_grouper', lambda: count_groups(memoryview_grouper(inputs, n))),
+        ('array_grouper', lambda: len(array_grouper(inputs, n))),
+    ]
+    for name, run in groupers:
+        start = time.perf_counter()
+        groups = run()
+        elapsed = time.perf_counter() - start
+        # measured in a second run, tracemalloc slows the allocations down
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:<20} {:>8} groups {:7.3f} secs {:10.1f} MB peak'.format(name, groups, elapsed, peak / 2**20))
+
+
 def main():
     # Naive_grouper takes lot of memory
 
@@ -27,6 +93,13 @@ def main():
     nums = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
     print(list(grouper(nums, 4)))
 
+    # Records of 3 floats from an array, as views instead of tuples of floats
+    points = array('d', [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0])
+    print([record.tolist() for record in memoryview_grouper(points, 3)])
+    print(array_grouper(points, 3))
+
+    benchmark()
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,244 @@
+import heapq
+import itertools as it
+import pickle
+import random
+import statistics
+import tempfile
+import timeit
+
+
+# Reducers fold the values of a group into a state.
+# merge() combines two partial states, which the spilling mode relies on.
+
+class Reducer:
+    def create(self, value):
+        raise NotImplementedError
+
+    def add(self, state, value):
+        raise NotImplementedError
+
+    def merge(self, state, other):
+        raise NotImplementedError
+
+    def result(self, state):
+        return state
+
+
+class Collect(Reducer):
+    """All values of the group, in input order"""
+    def create(self, value):
+        return [value]
+
+    def add(self, state, value):
+        state.append(value)
+        return state
+
+    def merge(self, state, other):
+        state.extend(other)
+        return state
+
+
+class Count(Reducer):
+    def create(self, value):
+        return 1
+
+    def add(self, state, value):
+        return state + 1
+
+    def merge(self, state, other):
+        return state + other
+
+
+class Min(Reducer):
+    """Smallest value, the first one on ties (like min())"""
+    def __init__(self, key=None):
+        self.key = key
+
+    def create(self, value):
+        return value
+
+    def add(self, state, value):
+        if self.key is None:
+            return value if value < state else state
+        return value if self.key(value) < self.key(state) else state
+
+    merge = add
+
+
+class Median(Collect):
+    def __init__(self, key=None):
+        self.key = key
+
+    def result(self, state):
+        return statistics.median(state if self.key is None else map(self.key, state))
+
+
+class _Largest:
+    """Heap entry ordered so that the largest key (the latest on ties) is at the top of the heap
+
+    Comparing the keys directly, instead of negating them, works for any orderable key.
+    """
+    __slots__ = ('key', 'seq', 'value')
+
+    def __init__(self, key, seq, value):
+        self.key = key
+        self.seq = seq
+        self.value = value
+
+    def __lt__(self, other):
+        return (self.key, self.seq) > (other.key, other.seq)
+
+
+class TopK(Reducer):
+    """The k smallest values, ordered, kept in a bounded heap"""
+    def __init__(self, k, key=None):
+        self.k = k
+        self.key = key or (lambda value: value)
+        self.counter = it.count()
+
+    def create(self, value):
+        return self.add([], value)
+
+    def add(self, state, value):
+        return self._push(state, _Largest(self.key(value), next(self.counter), value))
+
+    def _push(self, state, entry):
+        # the top of the heap is the entry to drop first
+        if len(state) < self.k:
+            heapq.heappush(state, entry)
+        elif state[0] < entry:
+            heapq.heapreplace(state, entry)
+        return state
+
+    def merge(self, state, other):
+        for entry in other:
+            self._push(state, entry)
+        return state
+
+    def result(self, state):
+        return [entry.value for entry in sorted(state, reverse=True)]
+
+
+def aggregate(iterable, key, reducer=None):
+    """Group `iterable` on `key` in a single pass, return {key: reduced value}
+
+    Unlike it.groupby(sorted(...)) nothing is sorted and the input does not
+    have to be materialized. The groups appear in order of first occurrence.
+    """
+    reducer = reducer or Collect()
+    create, add = reducer.create, reducer.add
+    states = {}
+    for value in iterable:
+        k = key(value)
+        if k in states:
+            states[k] = add(states[k], value)
+        else:
+            states[k] = create(value)
+    return {k: reducer.result(state) for k, state in states.items()}
+
+
+def groupby(iterable, key=None, sort_keys=False):
+    """Drop-in for sort_and_group(): yields (key, list of items) pairs
+
+    Only the distinct keys are sorted (with `sort_keys`), not the items,
+    and the items of a group keep their input order.
+    """
+    groups = aggregate(iterable, key or (lambda value: value))
+    keys = sorted(groups) if sort_keys else groups
+    return ((k, groups[k]) for k in keys)
+
+
+def aggregate_nested(iterable, keys, reducer=None):
+    """Group on several keys in one pass, return nested dicts {k1: {k2: ...}}"""
+    flat = aggregate(iterable, lambda value: tuple(k(value) for k in keys), reducer)
+    nested = {}
+    for composite, result in flat.items():
+        level = nested
+        for k in composite[:-1]:
+            level = level.setdefault(k, {})
+        level[composite[-1]] = result
+    return nested
+
+
+def aggregate_spilling(iterable, key, reducer=None, max_groups=100000, partitions=16, tmpdir=None):
+    """Like aggregate(), but for more groups than fit in memory
+
+    Whenever `max_groups` partial states are in memory they are written
+    to `partitions` temporary files chosen by the hash of the key.
+    Every partition is then merged on its own, so only about
+    1/partitions of the groups are in memory at once. Yields (key, result).
+    """
+    reducer = reducer or Collect()
+    create, add = reducer.create, reducer.add
+    states = {}
+    files = None
+
+    def spill():
+        for k, state in states.items():
+            pickle.dump((k, state), files[hash(k) % partitions], pickle.HIGHEST_PROTOCOL)
+        states.clear()
+
+    try:
+        for value in iterable:
+            k = key(value)
+            if k in states:
+                states[k] = add(states[k], value)
+            else:
+                states[k] = create(value)
+                if len(states) >= max_groups:
+                    if files is None:
+                        files = [tempfile.TemporaryFile(dir=tmpdir) for _ in range(partitions)]
+                    spill()
+
+        if files is None:
+            # everything fitted in memory
+            for k, state in states.items():
+                yield k, reducer.result(state)
+            return
+
+        spill()
+        for spill_file in files:
+            spill_file.seek(0)
+            merged = {}
+            while True:
+                try:
+                    k, state = pickle.load(spill_file)
+                except EOFError:
+                    break
+                merged[k] = reducer.merge(merged[k], state) if k in merged else state
+            spill_file.close()
+            for k, state in merged.items():
+                yield k, reducer.result(state)
+    finally:
+        for spill_file in files or ():
+            spill_file.close()
+
+
+def main():
+    from swimmers import read_events, sort_and_group
+
+    # a shuffled copy, real meet data does not arrive in repeating blocks
+    events = list(read_events('swimmers.csv')) * 100
+    random.Random(0).shuffle(events)
+
+    def sort_based():
+        return {(stroke, name): min(evts)
+                for stroke, by_stroke in sort_and_group(events, key=lambda evt: evt.stroke)
+                for name, evts in sort_and_group(by_stroke, key=lambda evt: evt.name)}
+
+    def hash_based():
+        return aggregate(events, key=lambda evt: (evt.stroke, evt.name), reducer=Min())
+
+    def spilling():
+        # far fewer groups in memory than exist, to exercise the spill files
+        return dict(aggregate_spilling(events, key=lambda evt: (evt.stroke, evt.name),
+                                       reducer=Min(), max_groups=100, partitions=4))
+
+    assert sort_based() == hash_based() == spilling()
+    print('{} events'.format(len(events)))
+    for func in sort_based, hash_based, spilling:
+        print('{:<12} {:.4f} secs'.format(func.__name__, min(timeit.repeat(func, number=1, repeat=5))))
+
+
+if __name__ == '__main__':
+    main()
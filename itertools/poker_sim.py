@@ -0,0 +1,194 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import random
+import time
+
+import deck
+
+np = deck.np
+
+
+CATEGORIES = ['high card', 'pair', 'two pair', 'three of a kind', 'straight',
+              'flush', 'full house', 'four of a kind', 'straight flush']
+(HIGH_CARD, PAIR, TWO_PAIR, THREE, STRAIGHT,
+ FLUSH, FULL_HOUSE, FOUR, STRAIGHT_FLUSH) = range(len(CATEGORIES))
+
+# Probability of every category for a five card hand from a full deck
+EXACT = [0.5011774, 0.4225690, 0.0475390, 0.0211285, 0.0039246,
+         0.0019654, 0.0014406, 0.0002401, 0.0000154]
+
+
+# Lookup tables, computed once at import
+
+def _pair_category(pattern):
+    """Category of five sorted ranks, from which neighbours are equal (one bit per neighbour pair)"""
+    runs, run = [], 0
+    for i in range(5):
+        if i < 4 and pattern >> i & 1:
+            run += 1
+        elif run:
+            runs.append(run)
+            run = 0
+    # e.g. two separate pairs of equal neighbours is two pair, two equal neighbours in a row is three of a kind
+    return {(): HIGH_CARD, (1,): PAIR, (1, 1): TWO_PAIR, (2,): THREE,
+            (1, 2): FULL_HOUSE, (3,): FOUR}[tuple(sorted(runs))]
+
+
+PAIR_TABLE = [_pair_category(pattern) for pattern in range(15)] + [FOUR]   # 15 cannot happen
+
+# Rank bit masks of the ten straights (rank 0 is the ace, 12 the two), including the wheel A-5-4-3-2
+STRAIGHT_MASKS = [0b11111 << i for i in range(9)] + [1 | 0b1111 << 9]
+STRAIGHT_TABLE = bytearray(1 << 13)
+for mask in STRAIGHT_MASKS:
+    STRAIGHT_TABLE[mask] = 1
+
+
+def category(hand):
+    """Category of a five card hand (a sequence of card codes)"""
+    ranks = sorted(code >> 2 for code in hand)
+    pattern = 0
+    for i in range(4):
+        if ranks[i] == ranks[i + 1]:
+            pattern |= 1 << i
+    mask = 0
+    for r in ranks:
+        mask |= 1 << r
+    straight = STRAIGHT_TABLE[mask]
+    suit = hand[0] & 3
+    if all(code & 3 == suit for code in hand):
+        return STRAIGHT_FLUSH if straight else FLUSH
+    return STRAIGHT if straight else PAIR_TABLE[pattern]
+
+
+if np is not None:
+    _PAIR_TABLE = np.array(PAIR_TABLE, dtype=np.uint8)
+    _STRAIGHT_TABLE = np.frombuffer(bytes(STRAIGHT_TABLE), dtype=np.bool_)
+    _NEIGHBOUR_BITS = np.array([1, 2, 4, 8], dtype=np.uint8)
+
+
+def categories(hands):
+    """category() of every row of a (hands, 5) uint8 array"""
+    ranks = np.sort(hands >> 2, axis=1)
+    pattern = (ranks[:, 1:] == ranks[:, :-1]) @ _NEIGHBOUR_BITS
+    result = _PAIR_TABLE[pattern]
+    mask = np.bitwise_or.reduce(np.left_shift(1, ranks, dtype=np.uint16), axis=1)
+    straight = _STRAIGHT_TABLE[mask]
+    suits = hands & 3
+    flush = (suits == suits[:, :1]).all(axis=1)
+    result[straight] = STRAIGHT
+    result[flush] = FLUSH
+    result[flush & straight] = STRAIGHT_FLUSH
+    return result
+
+
+# Workers
+
+def run_chunk(seed, trials, num_hands=1, batch_size=100000):
+    """Deal `trials` shuffled decks, return the histogram of hand categories
+
+    `seed` is a numpy.random.SeedSequence, or a string without NumPy.
+    """
+    if np is None:
+        histogram = [0] * len(CATEGORIES)
+        hand_deck = deck.Deck(rng=random.Random(seed))
+        for _ in range(trials):
+            for hand in hand_deck.reset().shuffle(num_hands * 5).deal(num_hands):
+                histogram[category(hand)] += 1
+        return histogram
+    histogram = np.zeros(len(CATEGORIES), dtype=np.int64)
+    for hands in deck.deal_batches(trials, num_hands, batch_size=batch_size, rng=np.random.default_rng(seed)):
+        histogram += np.bincount(categories(hands.reshape(-1, 5)), minlength=len(CATEGORIES))
+    return histogram.tolist()
+
+
+def chunk_seeds(seed, chunks):
+    """An independent, reproducible random stream for every chunk
+
+    The streams belong to the chunks, not to the workers, so the result
+    depends on the seed only, and not on the number of workers.
+    """
+    if np is None:
+        return [f'{seed}/{i}' for i in range(chunks)]
+    return np.random.SeedSequence(seed).spawn(chunks)
+
+
+# The runner
+
+Result = namedtuple('Result', ['histogram', 'hands', 'trials', 'seconds', 'converged'])
+
+
+def confidence_half_width(count, total, z=1.96):
+    """Half width of the normal approximation confidence interval of count / total"""
+    p = count / total
+    return z * math.sqrt(p * (1 - p) / total)
+
+
+def simulate(trials, workers=None, chunk_trials=200000, num_hands=1, seed=0, tolerance=None, z=1.96):
+    """Deal `trials` decks over a process pool and count the categories of the hands
+
+    The trials are split into chunks with their own random streams, and the
+    histograms of the chunks are merged in chunk order. With `tolerance`, the
+    simulation stops as soon as the confidence interval of every category is
+    narrower than +/- tolerance (an absolute probability), which needs fewer
+    trials than `trials` when the tolerance is loose.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = math.ceil(trials / chunk_trials)
+    seeds = chunk_seeds(seed, chunks)
+    sizes = [min(chunk_trials, trials - i * chunk_trials) for i in range(chunks)]
+    histogram = [0] * len(CATEGORIES)
+    done = 0
+    converged = False
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep every worker busy, but do not queue chunks that early stopping would waste
+        pending = []
+        submitted = 0
+        while done < chunks:
+            while submitted < chunks and len(pending) < 2 * workers:
+                pending.append(executor.submit(run_chunk, seeds[submitted], sizes[submitted], num_hands))
+                submitted += 1
+            partial = pending.pop(0).result()
+            histogram = [a + b for a, b in zip(histogram, partial)]
+            done += 1
+            hands = sum(histogram)
+            if tolerance is not None and all(
+                    confidence_half_width(count, hands, z) < tolerance for count in histogram):
+                converged = True
+                for future in pending:
+                    future.cancel()
+                break
+    seconds = time.perf_counter() - start
+    return Result(histogram, sum(histogram), sum(sizes[:done]), seconds, converged)
+
+
+def report(result, z=1.96):
+    print('{} trials, {} hands in {:.2f} secs: {:.0f} trials/s{}'.format(
+        result.trials, result.hands, result.seconds, result.trials / result.seconds,
+        ' (converged)' if result.converged else ''))
+    for name, count, exact in zip(CATEGORIES, result.histogram, EXACT):
+        p = count / result.hands
+        print('{:<16} {:>10} {:9.6f} +/- {:.6f}  exact {:.6f}'.format(
+            name, count, p, confidence_half_width(count, result.hands, z), exact))
+
+
+def main():
+    # check the lookup tables against the classic examples
+    cards = deck.CODES
+    royal = [cards[rank, '♠'] for rank in ('A', 'K', 'Q', 'J', '10')]
+    wheel = [cards['A', '♥']] + [cards[rank, '♠'] for rank in ('5', '4', '3', '2')]
+    full = [cards['K', suit] for suit in deck.SUITS[:3]] + [cards['2', suit] for suit in deck.SUITS[:2]]
+    assert [category(hand) for hand in (royal, wheel, full)] == [STRAIGHT_FLUSH, STRAIGHT, FULL_HOUSE]
+    if np is not None:
+        hands = deck.deal_decks(deck.shuffled_decks(10000, 1)).reshape(-1, 5)
+        assert categories(hands).tolist() == [category(hand) for hand in hands.tolist()]
+
+    report(simulate(2 * 10 ** 6, seed=2024))
+    print()
+    report(simulate(10 ** 8, seed=2024, tolerance=0.0005))
+
+
+if __name__ == '__main__':
+    main()
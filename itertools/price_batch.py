@@ -0,0 +1,117 @@
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from multiprocessing import shared_memory
+import os
+import time
+
+import price_columns as pc
+from price_stream import PriceStats, Streak
+from s_and_p_500 import DataPoint, read_prices
+
+
+FileSummary = namedtuple('FileSummary', ['path', 'rows', 'max_gain', 'max_loss', 'longest_streak'])
+
+# Every file is reduced to one fixed-width record of float64 fields
+# (day ordinals are exact in a float64, 0 stands for "no date"):
+# rows, max gain day, max gain, max loss day, max loss, streak length, first day, last day
+RECORD_FIELDS = 8
+
+
+def reduce_file(path):
+    """Reduce one price file to its result record"""
+    if pc.np is not None:
+        days, values = pc.load_columns(path)
+        gains = pc.percent_changes(values)
+        gain_days = days[1:]
+        gain_idx, loss_idx = pc.max_index(gains), pc.min_index(gains)
+        start, stop = pc.longest_run(gains > 0)
+        return (len(values),
+                gain_days[gain_idx] if gain_idx >= 0 else 0, gains[gain_idx] if gain_idx >= 0 else 0,
+                gain_days[loss_idx] if loss_idx >= 0 else 0, gains[loss_idx] if loss_idx >= 0 else 0,
+                stop - start,
+                gain_days[start] if stop > start else 0, gain_days[stop - 1] if stop > start else 0)
+    stats = PriceStats().consume(read_prices(path))
+
+    def ordinal(day):
+        return day.toordinal() if day is not None else 0
+    streak = stats.longest_streak
+    return (stats.count,
+            ordinal(stats.max_gain.date), stats.max_gain.value,
+            ordinal(stats.max_loss.date), stats.max_loss.value,
+            streak.length, ordinal(streak.first), ordinal(streak.last))
+
+
+def _process_shard(shm_name, shard):
+    """Worker: reduce a shard of (index, path) pairs into the shared result table"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    table = shm.buf.cast('d')
+    try:
+        for index, path in shard:
+            offset = index * RECORD_FIELDS
+            table[offset:offset + RECORD_FIELDS] = array('d', map(float, reduce_file(path)))
+    finally:
+        table.release()
+        shm.close()
+    return len(shard)
+
+
+def _to_summary(path, record):
+    def day(ordinal):
+        return date.fromordinal(int(ordinal)) if ordinal else None
+    rows, gain_day, gain, loss_day, loss, length, first, last = record
+    return FileSummary(path, int(rows),
+                       DataPoint(day(gain_day), gain), DataPoint(day(loss_day), loss),
+                       Streak(int(length), day(first), day(last)))
+
+
+def analyze_files(paths, max_workers=None, shard_size=None):
+    """Reduce many price files in a process pool
+
+    Files are sharded across the workers, and every worker writes its
+    fixed-width result records into a shared memory table, so only the
+    file names travel to the workers and nothing is pickled back.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    if shard_size is None:
+        # a few shards per worker keeps the pool busy until the end
+        shard_size = max(1, len(paths) // (max_workers * 4))
+    indexed = list(enumerate(paths))
+    shards = [indexed[i:i + shard_size] for i in range(0, len(indexed), shard_size)]
+
+    shm = shared_memory.SharedMemory(create=True, size=len(paths) * RECORD_FIELDS * 8)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_process_shard, shm.name, shard) for shard in shards]
+            for future in futures:
+                future.result()
+        table = shm.buf.cast('d')
+        records = [tuple(table[i * RECORD_FIELDS:(i + 1) * RECORD_FIELDS]) for i in range(len(paths))]
+        table.release()
+    finally:
+        shm.close()
+        shm.unlink()
+    return [_to_summary(path, record) for path, record in zip(paths, records)]
+
+
+def main():
+    paths = ['SP500.csv'] * 16
+
+    start = time.perf_counter()
+    serial = [_to_summary(path, reduce_file(path)) for path in paths]
+    print('Serial took %.3f seconds' % (time.perf_counter() - start))
+
+    start = time.perf_counter()
+    parallel = analyze_files(paths)
+    print('Process pool took %.3f seconds' % (time.perf_counter() - start))
+
+    print(serial == parallel)
+    print(parallel[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+from array import array
+import csv
+from datetime import date
+import mmap
+import os
+import struct
+
+import dateparse as dp
+
+try:
+    import numpy as np
+except ImportError:  # the tuple based code in s_and_p_500.py works without NumPy
+    np = None
+
+
+# date.toordinal() of 1970-01-01, the origin of numpy.datetime64
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Binary sidecar written next to the CSV file:
+# header, int32 day ordinals, padding to 8 bytes, float64 prices.
+# It uses the native byte order, so it is only meant for the machine that wrote it.
+SIDECAR_SUFFIX = '.cols'
+SIDECAR_MAGIC = b'PCOL'
+SIDECAR_VERSION = 1
+# magic, version, number of rows, source mtime in ns, source size in bytes
+SIDECAR_HEADER = struct.Struct('=4sIqqq')
+
+
+def sidecar_path(csvfile):
+    return os.fspath(csvfile) + SIDECAR_SUFFIX
+
+
+def _padding(rows):
+    return (-rows * 4) % 8
+
+
+def write_sidecar(csvfile, days, values):
+    """Store the parsed columns of `csvfile` in its binary sidecar"""
+    stat = os.stat(csvfile)
+    days, values = array('i', days), array('d', values)
+    path = sidecar_path(csvfile)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as outfile:
+        outfile.write(SIDECAR_HEADER.pack(SIDECAR_MAGIC, SIDECAR_VERSION, len(days),
+                                          stat.st_mtime_ns, stat.st_size))
+        outfile.write(days.tobytes())
+        outfile.write(bytes(_padding(len(days))))
+        outfile.write(values.tobytes())
+    # readers never see a half written file
+    os.replace(tmp_path, path)
+
+
+def open_sidecar(csvfile):
+    """Map the sidecar of `csvfile` into memory without copying it
+
+    Returns (days, values) memoryviews, or None if the sidecar is missing
+    or was written for another version of the CSV file.
+    """
+    try:
+        stat = os.stat(csvfile)
+        infile = open(sidecar_path(csvfile), 'rb')
+    except OSError:
+        return None
+    with infile:
+        if os.fstat(infile.fileno()).st_size < SIDECAR_HEADER.size:
+            return None
+        mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, rows, mtime_ns, size = SIDECAR_HEADER.unpack_from(mapped)
+    offset = SIDECAR_HEADER.size
+    end = offset + rows * 4 + _padding(rows) + rows * 8
+    if ((magic, version, mtime_ns, size) != (SIDECAR_MAGIC, SIDECAR_VERSION, stat.st_mtime_ns, stat.st_size)
+            or len(mapped) != end):
+        mapped.close()
+        return None
+    view = memoryview(mapped)
+    days = view[offset:offset + rows * 4].cast('i')
+    offset += rows * 4 + _padding(rows)
+    values = view[offset:end].cast('d')
+    return days, values
+
+
+def parse_columns(csvfile, date_column='Date', value_column='Adj Close'):
+    """Parse the date and price columns of `csvfile` without NumPy"""
+    with open(csvfile, newline='') as infile:
+        reader = csv.DictReader(infile)
+        dates, values = [], array('d')
+        for row in reader:
+            dates.append(row[date_column])
+            values.append(float(row[value_column]))
+    days = array('i', (day.toordinal() for day in dp.parse_dates(dates)))
+    return days, values
+
+
+def read_columns(csvfile, cache=True):
+    """(days, values) of `csvfile`, from its sidecar when that is up to date"""
+    if cache:
+        columns = open_sidecar(csvfile)
+        if columns is not None:
+            return columns
+    days, values = parse_columns(csvfile)
+    if cache:
+        _try_write_sidecar(csvfile, days, values)
+    return days, values
+
+
+def _try_write_sidecar(csvfile, days, values):
+    try:
+        write_sidecar(csvfile, days, values)
+    except OSError:
+        # a read-only directory only costs us the cache
+        pass
+
+
+def load_columns(csvfile, date_column='Date', value_column='Adj Close', cache=True):
+    """Read the date and price columns of `csvfile` into two typed arrays
+
+    Returns (days, values): int32 day ordinals (see date.toordinal()) and float64 prices.
+    With `cache` the arrays are views on the memory mapped sidecar when it is up to date.
+    """
+    if cache:
+        columns = open_sidecar(csvfile)
+        if columns is not None:
+            days, values = columns
+            return np.frombuffer(days, dtype=np.int32), np.frombuffer(values, dtype=np.float64)
+    with open(csvfile, newline='') as infile:
+        reader = csv.reader(infile)
+        header = next(reader)
+        date_idx, value_idx = header.index(date_column), header.index(value_column)
+        dates, values = [], []
+        for row in reader:
+            dates.append(row[date_idx])
+            values.append(row[value_idx])
+    # NumPy parses the whole ISO date column at once
+    days = (np.array(dates, dtype='datetime64[D]').astype(np.int64) + EPOCH_ORDINAL).astype(np.int32)
+    values = np.array(values, dtype=np.float64)
+    if cache:
+        _try_write_sidecar(csvfile, days, values)
+    return days, values
+
+
+def percent_changes(values):
+    """Daily percent change; element i compares day i + 1 with day i"""
+    return 100 * (values[1:] / values[:-1] - 1.)
+
+
+def max_index(values, above=0):
+    """Index of the first largest value greater than `above`, or -1"""
+    candidates = np.where(values > above, values, -np.inf)
+    idx = int(np.argmax(candidates)) if len(values) else -1
+    return idx if idx >= 0 and values[idx] > above else -1
+
+
+def min_index(values, below=0):
+    """Index of the first smallest value less than `below`, or -1"""
+    candidates = np.where(values < below, values, np.inf)
+    idx = int(np.argmin(candidates)) if len(values) else -1
+    return idx if idx >= 0 and values[idx] < below else -1
+
+
+def runs(mask):
+    """Start and stop indices of every run of True values in `mask`"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def longest_run(mask):
+    """(start, stop) of the longest run of True values, the last one on ties"""
+    starts, stops = runs(mask)
+    if not len(starts):
+        return 0, 0
+    lengths = stops - starts
+    last = len(lengths) - 1 - int(np.argmax(lengths[::-1]))
+    return int(starts[last]), int(stops[last])
+
+
+def ordinal_to_date(ordinal):
+    return date.fromordinal(int(ordinal))
@@ -0,0 +1,187 @@
+from collections import deque, namedtuple
+import csv
+from datetime import date
+import json
+import math
+import time
+
+from s_and_p_500 import DataPoint, read_prices
+
+
+Streak = namedtuple('Streak', ['length', 'first', 'last'])
+
+
+class PriceStats:
+    """Online version of the analysis in s_and_p_500.main()
+
+    Feed it DataPoints one at a time with update(). It keeps only the previous
+    price, the running extrema and streaks and a bounded window of gains,
+    so the memory used does not grow with the length of the series.
+    """
+    def __init__(self, window=20):
+        self.window = window
+        self.prev = None
+        self.count = 0
+        zdp = DataPoint(None, 0)  # zero DataPoint, like the batch version
+        self.max_gain = zdp
+        self.max_loss = zdp
+        self.streak = Streak(0, None, None)
+        self.longest_streak = Streak(0, None, None)
+        self.gains = deque(maxlen=window)
+        self._sum = 0.
+        self._sum_sq = 0.
+
+    def update(self, point):
+        """Add the next price and return its daily gain (None for the first price)"""
+        prev, self.prev = self.prev, point
+        self.count += 1
+        if prev is None:
+            return None
+        gain = DataPoint(point.date, 100*(point.value/prev.value - 1.))
+
+        # strict comparisons keep the earliest extremum, like functools.reduce(max, ...)
+        if gain.value > 0 and gain.value > self.max_gain.value:
+            self.max_gain = gain
+        if gain.value < 0 and gain.value < self.max_loss.value:
+            self.max_loss = gain
+
+        if gain.value > 0:
+            first = self.streak.first if self.streak.length else gain.date
+            self.streak = Streak(self.streak.length + 1, first, gain.date)
+            # a later streak of the same length wins, as in the batch version
+            if self.streak.length >= self.longest_streak.length:
+                self.longest_streak = self.streak
+        else:
+            self.streak = Streak(0, None, None)
+
+        if len(self.gains) == self.window:
+            oldest = self.gains[0]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+        self.gains.append(gain.value)
+        self._sum += gain.value
+        self._sum_sq += gain.value * gain.value
+        return gain
+
+    def consume(self, points):
+        for point in points:
+            self.update(point)
+        return self
+
+    @property
+    def rolling_mean(self):
+        """Mean gain over the last `window` days"""
+        return self._sum / len(self.gains) if self.gains else 0.
+
+    @property
+    def rolling_stdev(self):
+        """Standard deviation of the gain over the last `window` days"""
+        n = len(self.gains)
+        if n < 2:
+            return 0.
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(variance, 0.))
+
+    # Checkpoints
+
+    def state(self):
+        """JSON serializable snapshot from which from_state() can resume"""
+        def point(p):
+            return None if p is None else [_iso(p.date), p.value]
+
+        def streak(s):
+            return [s.length, _iso(s.first), _iso(s.last)]
+
+        return {
+            'window': self.window,
+            'count': self.count,
+            'prev': point(self.prev),
+            'max_gain': point(self.max_gain),
+            'max_loss': point(self.max_loss),
+            'streak': streak(self.streak),
+            'longest_streak': streak(self.longest_streak),
+            'gains': list(self.gains),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        def point(p):
+            return None if p is None else DataPoint(_date(p[0]), p[1])
+
+        def streak(s):
+            return Streak(s[0], _date(s[1]), _date(s[2]))
+
+        stats = cls(window=state['window'])
+        stats.count = state['count']
+        stats.prev = point(state['prev'])
+        stats.max_gain = point(state['max_gain'])
+        stats.max_loss = point(state['max_loss'])
+        stats.streak = streak(state['streak'])
+        stats.longest_streak = streak(state['longest_streak'])
+        for gain in state['gains']:
+            stats.gains.append(gain)
+            stats._sum += gain
+            stats._sum_sq += gain * gain
+        return stats
+
+    def save(self, path):
+        with open(path, 'w') as outfile:
+            json.dump(self.state(), outfile)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as infile:
+            return cls.from_state(json.load(infile))
+
+
+def _iso(day):
+    return None if day is None else day.isoformat()
+
+
+def _date(text):
+    return None if text is None else date.fromisoformat(text)
+
+
+def follow_prices(csvfile, poll_interval=1.0, stop=None):
+    """Yield DataPoints from `csvfile`, then keep waiting for appended rows
+
+    Iteration ends when the `stop()` callable returns True.
+    """
+    with open(csvfile, newline='') as infile:
+        columns = next(csv.reader([infile.readline()]))
+        date_idx, value_idx = columns.index('Date'), columns.index('Adj Close')
+        pending = ''
+        while True:
+            line = infile.readline()
+            if not line or not line.endswith('\n'):
+                # keep a partially written row until its end arrives
+                pending += line
+                if stop is not None and stop():
+                    return
+                time.sleep(poll_interval)
+                continue
+            row = next(csv.reader([pending + line]))
+            pending = ''
+            yield DataPoint(date.fromisoformat(row[date_idx]), float(row[value_idx]))
+
+
+def main():
+    prices = read_prices('SP500.csv')
+    stats = PriceStats()
+    # process half of the file, checkpoint, and resume in a new object
+    for point in prices:
+        stats.update(point)
+        if stats.count == 8000:
+            break
+    stats = PriceStats.from_state(json.loads(json.dumps(stats.state())))
+    stats.consume(prices)
+
+    print('Max gain: {1:.2f}% on {0}'.format(*stats.max_gain))
+    print('Max loss: {1:.2f}% on {0}'.format(*stats.max_loss))
+    print('Longest growth streak: {0} days ({1} to {2})'.format(*stats.longest_streak))
+    print('Last {} days: mean {:.3f}%, stdev {:.3f}%'.format(
+        stats.window, stats.rolling_mean, stats.rolling_stdev))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
 from collections import namedtuple
 import csv
-from datetime import datetime
+from datetime import date
 import itertools as it
 import functools as ft
 
+import dateparse as dp
+import price_columns as pc
+
 
 class DataPoint(namedtuple('DataPoint', ['date', 'value'])):
     __slots__ = ()
@@ -34,17 +37,25 @@ def consecutive_positives(sequence, zero=0):
 # transform it into a sequence gains of daily percent changes using the “Adj Close” column.
 
 
-def read_prices(csvfile, _strptime=datetime.strptime):
+def read_prices(csvfile, _parse_date=dp.parse_date, cache=True):
+    if cache:
+        # parsed columns are kept in a binary sidecar file next to the CSV
+        days, values = pc.read_columns(csvfile)
+        for day, value in zip(days, values):
+            yield DataPoint(date=date.fromordinal(day), value=value)
+        return
     with open(csvfile) as infile:
         reader = csv.DictReader(infile)
         for row in reader:
-            yield DataPoint(date=_strptime(row['Date'], '%Y-%m-%d').date(),
+            yield DataPoint(date=_parse_date(row['Date']),
                             value=float(row['Adj Close']))
 
 
-def main():
-    # Read prices and calculate daily percent change.
-    prices = tuple(read_prices('SP500.csv'))
+Summary = namedtuple('Summary', ['max_gain', 'max_loss', 'longest_streak'])
+
+
+def analyze(prices):
+    """Tuple based analysis of a sequence of DataPoints"""
     # prices needs to be transformed to a sequence of daily percent changes
     gains = tuple(DataPoint(day.date, 100*(day.value/prev_day.value - 1.))
                   for day, prev_day in zip(prices[1:], prices))
@@ -60,6 +71,32 @@ def main():
     # Determine the length of the longest tuple in growth_streaks and the beginning and ending dates of the streak.
     longest_streak = ft.reduce(lambda x, y: x if len(x) > len(y) else y,
                                growth_streaks)
+    return Summary(max_gain, max_loss, longest_streak)
+
+
+def analyze_columns(days, values):
+    """Same results as analyze(), computed with NumPy on the columns from price_columns.load_columns()"""
+    gains = pc.percent_changes(values)
+    gain_days = days[1:]
+
+    def point(idx):
+        if idx < 0:
+            return DataPoint(None, 0)
+        return DataPoint(pc.ordinal_to_date(gain_days[idx]), float(gains[idx]))
+
+    start, stop = pc.longest_run(gains > 0)
+    longest_streak = tuple(point(idx) for idx in range(start, stop))
+    return Summary(point(pc.max_index(gains)), point(pc.min_index(gains)), longest_streak)
+
+
+def main():
+    if pc.np is not None:
+        # Load the columns once and let NumPy do the work.
+        summary = analyze_columns(*pc.load_columns('SP500.csv'))
+    else:
+        # Read prices and calculate daily percent change.
+        summary = analyze(tuple(read_prices('SP500.csv')))
+    max_gain, max_loss, longest_streak = summary
 
     # Display results.
     print('Max gain: {1:.2f}% on {0}'.format(*max_gain))
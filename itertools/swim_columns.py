@@ -0,0 +1,114 @@
+import csv
+import heapq
+import itertools as it
+
+import dateparse as dp
+
+try:
+    import numpy as np
+except ImportError:  # select_teams() falls back to a single hash aggregation pass
+    np = None
+
+
+class SwimColumns:
+    """swimmers.csv as columns: stroke and name codes, times in integer microseconds
+
+    The codes index into the sorted `strokes` and `names` lists,
+    so comparing codes is the same as comparing the strings.
+    """
+    def __init__(self, strokes, names, stroke_codes, name_codes, times):
+        self.strokes = strokes
+        self.names = names
+        self.stroke_codes = stroke_codes
+        self.name_codes = name_codes
+        self.times = times      # one row per event, one column per heat
+
+    @classmethod
+    def load(cls, csvfile):
+        with open(csvfile, newline='') as infile:
+            reader = csv.reader(infile)
+            next(reader)  # Skip header.
+            rows = list(reader)
+        strokes = sorted({row[2] for row in rows})
+        names = sorted({row[1] for row in rows})
+        stroke_index = {stroke: code for code, stroke in enumerate(strokes)}
+        name_index = {name: code for code, name in enumerate(names)}
+        stroke_codes = np.array([stroke_index[row[2]] for row in rows], dtype=np.int32)
+        name_codes = np.array([name_index[row[1]] for row in rows], dtype=np.int32)
+        times = np.array([[dp.parse_micros(t) for t in row[3:]] for row in rows], dtype=np.int64)
+        return cls(strokes, names, stroke_codes, name_codes, times)
+
+    def medians(self):
+        """Median time of every row, like statistics.median() over its heats"""
+        # an odd number of heats, so the median is the middle value
+        return np.sort(self.times, axis=1)[:, self.times.shape[1] // 2]
+
+    def best_times(self):
+        """Best median per (stroke, name) as a strokes x names table, -1 if never swum"""
+        missing = np.iinfo(np.int64).max
+        best = np.full((len(self.strokes), len(self.names)), missing, dtype=np.int64)
+        # grouped minimum in one vectorized pass
+        np.minimum.at(best, (self.stroke_codes, self.name_codes), self.medians())
+        best[best == missing] = -1
+        return best
+
+
+def smallest(times, k):
+    """Indices of the k smallest non-negative times, ordered by (time, index)
+
+    argpartition() finds the k-th time without sorting everything;
+    ties on the boundary are kept so the result matches a full stable sort.
+    """
+    candidates = np.flatnonzero(times >= 0)
+    if len(candidates) > k:
+        kth = np.partition(times[candidates], k - 1)[k - 1]
+        candidates = candidates[times[candidates] <= kth]
+    # lexsort uses the last key first: by time, then by index (that is, by name)
+    order = np.lexsort((candidates, times[candidates]))
+    return candidates[order][:k]
+
+
+def select_teams(csvfile, team_size=4, labels=('A', 'B')):
+    """Return {stroke: [(label, names), ...]} with the same teams as swimmers.main()"""
+    if np is None:
+        return _select_teams_python(csvfile, team_size, labels)
+    columns = SwimColumns.load(csvfile)
+    best = columns.best_times()
+    teams = {}
+    for code, stroke in enumerate(columns.strokes):
+        fastest = smallest(best[code], team_size * len(labels))
+        teams[stroke] = [(label, [columns.names[i] for i in fastest[n*team_size:(n+1)*team_size]])
+                         for n, label in enumerate(labels)]
+    return teams
+
+
+def _select_teams_python(csvfile, team_size, labels):
+    best = {}
+    with open(csvfile, newline='') as infile:
+        reader = csv.reader(infile)
+        next(reader)  # Skip header.
+        for _, name, stroke, *times in reader:
+            micros = sorted(dp.parse_micros(t) for t in times)[len(times) // 2]
+            key = (stroke, name)
+            if key not in best or micros < best[key]:
+                best[key] = micros
+    teams = {}
+    for stroke, group in it.groupby(sorted(best), key=lambda key: key[0]):
+        fastest = heapq.nsmallest(team_size * len(labels), ((best[key], key[1]) for key in group))
+        teams[stroke] = [(label, [name for _, name in fastest[n*team_size:(n+1)*team_size]])
+                         for n, label in enumerate(labels)]
+    return teams
+
+
+def main():
+    for stroke, teams in select_teams('swimmers.csv').items():
+        for team, names in teams:
+            print('{stroke} {team}: {names}'.format(
+                stroke=stroke.capitalize(),
+                team=team,
+                names=', '.join(names)
+            ))
+
+
+if __name__ == '__main__':
+    main()
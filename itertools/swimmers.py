@@ -1,9 +1,11 @@
 from collections import namedtuple
 import csv
-import datetime
 import itertools as it
 import statistics
 
+import dateparse as dp
+import grouping
+
 
 class Event(namedtuple('Event', ['stroke', 'name', 'time'])):
     __slots__ = ()
@@ -22,10 +24,9 @@ def grouper(iterable, n, fillvalue=None):
     return it.zip_longest(*iters, fillvalue=fillvalue)
 
 
-def read_events(csvfile, _strptime=datetime.datetime.strptime):
+def read_events(csvfile, _parse_time=dp.parse_time):
     def _median(times):
-        return statistics.median((_strptime(time, '%M:%S:%f').time()
-                                  for time in row['Times']))
+        return statistics.median(_parse_time(time) for time in times)
 
     fieldnames = ['Event', 'Name', 'Stroke']
     with open(csvfile) as infile:
@@ -43,9 +44,11 @@ def main():
     # a tuple of Event objects is created
     events = tuple(read_events('swimmers.csv'))
     #  create a for loop that iterates over the data in the events tuple grouped by stroke
-    for stroke, evts in sort_and_group(events, key=lambda evt: evt.stroke):
+    # grouping.groupby() hashes the events into groups in one pass and only sorts the keys,
+    # giving the same groups in the same order as sort_and_group()
+    for stroke, evts in grouping.groupby(events, key=lambda evt: evt.stroke, sort_keys=True):
         # group the evts iterator by swimmer name
-        events_by_name = sort_and_group(evts, key=lambda evt: evt.name)
+        events_by_name = grouping.groupby(evts, key=lambda evt: evt.name, sort_keys=True)
         # calculate the best time for each swimmer in events_by_name
         best_times = (min(evt) for _, evt in events_by_name)
         # sort best_times by time and aggregate the result into groups of four
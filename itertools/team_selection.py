@@ -0,0 +1,114 @@
+import datetime
+import heapq
+
+from swimmers import Event, read_events
+
+
+class _Entry:
+    """Heap entry ordered so that the slowest swimmer is at the top of the heap"""
+    __slots__ = ('time', 'name', 'event')
+
+    def __init__(self, event):
+        self.time = event.time
+        self.name = event.name
+        self.event = event
+
+    def __lt__(self, other):
+        # ties on time are broken by name, like the stable sort in swimmers.main()
+        return (self.time, self.name) > (other.time, other.name)
+
+
+class StrokeRanking:
+    """Best time of every swimmer in one stroke, plus a bounded heap of the fastest `size`
+
+    A swimmer's best time can only get better, so a swimmer who dropped out
+    of the heap can only come back by posting a faster time. That makes the
+    heap exact without ever re-sorting all swimmers.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.best = {}
+        self.heap = []
+        self.in_heap = set()
+
+    def update(self, event):
+        """Record a time, return True if the fastest swimmers changed"""
+        best = self.best.get(event.name)
+        if best is not None and not event < best:
+            return False
+        self.best[event.name] = event
+        entry = _Entry(event)
+        if event.name in self.in_heap:
+            # the swimmer is already in the top, only their position changes
+            self.heap = [e for e in self.heap if e.name != event.name] + [entry]
+            heapq.heapify(self.heap)
+        elif len(self.heap) < self.size:
+            heapq.heappush(self.heap, entry)
+            self.in_heap.add(event.name)
+        elif self.heap[0] < entry:
+            dropped = heapq.heapreplace(self.heap, entry)
+            self.in_heap.discard(dropped.name)
+            self.in_heap.add(event.name)
+        else:
+            return False
+        return True
+
+    def fastest(self):
+        """The fastest swimmers, fastest first"""
+        return [entry.event for entry in sorted(self.heap, reverse=True)]
+
+
+class TeamSelector:
+    """Incremental version of the team selection in swimmers.main()
+
+    Events can be fed one at a time, e.g. after every heat of a live meet;
+    each update costs O(log(team_size * len(labels))).
+    """
+    def __init__(self, team_size=4, labels=('A', 'B')):
+        self.team_size = team_size
+        self.labels = labels
+        self.rankings = {}
+
+    def update(self, event):
+        ranking = self.rankings.get(event.stroke)
+        if ranking is None:
+            ranking = self.rankings[event.stroke] = StrokeRanking(self.team_size * len(self.labels))
+        return ranking.update(event)
+
+    def consume(self, events):
+        for event in events:
+            self.update(event)
+        return self
+
+    def teams(self, stroke):
+        """[(label, swimmers), ...] for `stroke`"""
+        fastest = self.rankings[stroke].fastest()
+        n = self.team_size
+        return [(label, fastest[i*n:(i+1)*n]) for i, label in enumerate(self.labels)]
+
+    def all_teams(self):
+        return {stroke: self.teams(stroke) for stroke in sorted(self.rankings)}
+
+
+def print_teams(selector):
+    for stroke, teams in selector.all_teams().items():
+        for team, swimmers in teams:
+            print('{stroke} {team}: {names}'.format(
+                stroke=stroke.capitalize(),
+                team=team,
+                names=', '.join(swimmer.name for swimmer in swimmers)
+            ))
+
+
+def main():
+    selector = TeamSelector().consume(read_events('swimmers.csv'))
+    print_teams(selector)
+
+    # a new personal best puts Ava into the freestyle A team
+    print('====')
+    selector.update(Event('freestyle', 'Ava', datetime.time(0, 0, 30)))
+    print_teams(selector)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+from multiprocessing import Process, shared_memory
+import threading
+import time
+import weakref
+
+from thread_lock import Counter, LockingCounter, run_threads, worker
+
+
+# All counters have the same interface as Counter and LockingCounter:
+# increment(n=1) and a `count` attribute.
+
+class ShardedCounter:
+    """Counter with one shard per thread, merged when `count` is read
+
+    Each thread only ever writes its own shard, so increment() takes no lock
+    and the threads never wait for each other. Reading the count is the
+    expensive side: it sums all shards, so read it rarely (e.g. when reporting).
+    The shards of finished threads are folded into one total, so memory stays
+    bounded by the number of live threads.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()   # only protects the list of shards
+        self._shards = []               # (weak reference to the thread, shard)
+        self._retired = 0               # what the finished threads counted
+
+    def increment(self, n=1):
+        try:
+            self._local.shard[0] += n
+        except AttributeError:
+            shard = self._local.shard = [n]
+            with self._lock:
+                self._fold_finished()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+
+    def _fold_finished(self):
+        # a finished thread counts no more, so its shard can be folded into one total
+        live = []
+        for ref, shard in self._shards:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                self._retired += shard[0]
+            else:
+                live.append((ref, shard))
+        self._shards = live
+
+    @property
+    def count(self):
+        with self._lock:
+            self._fold_finished()
+            return self._retired + sum(shard[0] for _, shard in self._shards)
+
+
+class Batch:
+    """Count locally and add to `counter` once every `size` increments
+
+    For counters with an expensive increment(), like LockingCounter or
+    SharedMemoryCounter: the lock is taken once per batch instead of once per item.
+    A Batch belongs to one thread. Use it as a context manager, so that
+    the last partial batch is flushed.
+    """
+    def __init__(self, counter, size=1000):
+        self.counter = counter
+        self.size = size
+        self.pending = 0
+
+    def increment(self, n=1):
+        self.pending += n
+        if self.pending >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.counter.increment(self.pending)
+            self.pending = 0
+
+    @property
+    def count(self):
+        return self.counter.count + self.pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class SharedMemoryCounter:
+    """Counter shared by several processes, with one int64 slot per process
+
+    Slot 0 belongs to the process that created the counter, the other
+    processes get their own slot with shard(i). Like ShardedCounter every
+    slot has a single writer, so no lock is needed, and `count` sums all slots.
+    Call unlink() (or use a with statement) in the creating process when done.
+    """
+    def __init__(self, slots=64, name=None, slot=0):
+        self.slots = slots
+        self.slot = slot
+        self._owner = name is None
+        if self._owner:
+            # new shared memory is zero-filled
+            self._shm = shared_memory.SharedMemory(create=True, size=slots * 8)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # the size may be rounded up to a whole page (macOS), only use the slots
+        self._cells = self._shm.buf[:slots * 8].cast('q')
+
+    def shard(self, slot):
+        """The same counter, incrementing `slot`: pass one to each process"""
+        if not 0 <= slot < self.slots:
+            raise ValueError(f'slot must be in range({self.slots}), not {slot}')
+        return _SharedShard(self._shm.name, self.slots, slot)
+
+    def increment(self, n=1):
+        self._cells[self.slot] += n
+
+    @property
+    def count(self):
+        return sum(self._cells)
+
+    def close(self):
+        self._cells.release()
+        self._shm.close()
+
+    def unlink(self):
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+
+class _SharedShard:
+    """Picklable handle to one slot of a SharedMemoryCounter, attached on first use"""
+    def __init__(self, name, slots, slot):
+        self.name = name
+        self.slots = slots
+        self.slot = slot
+        self._counter = None
+
+    def _attach(self):
+        if self._counter is None:
+            self._counter = SharedMemoryCounter(self.slots, self.name, self.slot)
+        return self._counter
+
+    def increment(self, n=1):
+        self._attach().increment(n)
+
+    @property
+    def count(self):
+        return self._attach().count
+
+    def __getstate__(self):
+        # the attached memory stays in this process, the other one attaches by name
+        return {'name': self.name, 'slots': self.slots, 'slot': self.slot, '_counter': None}
+
+
+def batch_worker(sensor_idx, items, counter, size=1000):
+    """Same as thread_lock.worker(), but the increments are batched"""
+    with Batch(counter, size) as batch:
+        for _ in range(items):
+            batch.increment()
+
+
+def _process_worker(func, sensor_idx, items, counter):
+    func(sensor_idx, items, counter)
+    counter._attach().close()
+
+
+def run_processes(func, items, counter):
+    """run_threads() with a process per sensor, each writing its own slot of `counter`"""
+    processes = []
+    for i in range(5):
+        args = (func, i, items, counter.shard(i + 1))
+        process = Process(target=_process_worker, args=args)
+        processes.append(process)
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def benchmark(items=200000):
+    runs = [
+        ('Counter', Counter, worker),
+        ('LockingCounter', LockingCounter, worker),
+        ('LockingCounter batched', LockingCounter, batch_worker),
+        ('ShardedCounter', ShardedCounter, worker),
+    ]
+    for name, make_counter, func in runs:
+        counter = make_counter()
+        start = time.perf_counter()
+        run_threads(func, items, counter)
+        elapsed = time.perf_counter() - start
+        print('{:<28} {:>8} of {} in {:.3f} secs, {:10.0f} increments/s'.format(
+            name, counter.count, 5 * items, elapsed, 5 * items / elapsed))
+
+    for name, func in [('SharedMemoryCounter', worker), ('SharedMemoryCounter batched', batch_worker)]:
+        with SharedMemoryCounter() as counter:
+            start = time.perf_counter()
+            run_processes(func, items, counter)
+            elapsed = time.perf_counter() - start
+            print('{:<28} {:>8} of {} in {:.3f} secs, {:10.0f} increments/s'.format(
+                name, counter.count, 5 * items, elapsed, 5 * items / elapsed))
+
+
+def main():
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+from array import array
+import functools
+import math
+import mmap
+import struct
+from time import time
+
+try:
+    import numpy as np
+except ImportError:  # the sieve is built in pure Python, which is fine for small bounds
+    np = None
+
+
+# File layout: header, then one uint16 per odd number
+HEADER = struct.Struct('=4sQ')
+MAGIC = b'SPF2'
+# the smallest prime factor of an odd composite n is at most isqrt(n) < 2**16
+MAX_BOUND = 2 ** 32 - 1
+
+
+class DivisorIndex:
+    """Smallest-prime-factor sieve up to `bound`, for factorizing many numbers quickly
+
+    Only odd numbers are stored (the smallest prime factor of an even number is 2),
+    and a smallest prime factor fits in a uint16 for any bound below 2**32,
+    so the table takes 1 byte per number: 100 MB for a bound of 10**8.
+    Any number up to the bound is factorized with one table lookup per prime factor.
+    Larger numbers fall back to trial division by the sieved primes, behind an LRU cache.
+    """
+    def __init__(self, bound, table=None, cache_size=4096):
+        self.bound = bound
+        table = table if table is not None else build_table(bound)
+        # indexing a memoryview returns plain ints, also for a NumPy table
+        self.table = memoryview(table)
+        self._primes = None
+        self.factorize_large = functools.lru_cache(maxsize=cache_size)(self._factorize_large)
+
+    def smallest_prime_factor(self, n):
+        if n % 2 == 0:
+            return 2
+        # index k stands for 2k + 1, a prime is its own smallest factor
+        return self.table[n // 2] or n
+
+    def prime_factors(self, n):
+        """{prime: exponent} for n >= 1"""
+        if n < 1:
+            raise ValueError(f'cannot factorize {n}, expected n >= 1')
+        if n > self.bound:
+            return dict(self.factorize_large(n))
+        factors = {}
+        # the powers of two first, then every lookup is for an odd number
+        twos = (n & -n).bit_length() - 1
+        if twos:
+            factors[2] = twos
+            n >>= twos
+        table = self.table
+        while n > 1:
+            p = table[n >> 1] or n
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        return factors
+
+    def divisors(self, n):
+        """Same result as list(factorize(n)): all divisors in increasing order"""
+        divs = [1]
+        for p, exponent in self.prime_factors(n).items():
+            powers = [p ** e for e in range(1, exponent + 1)]
+            divs += [d * q for q in powers for d in divs]
+        divs.sort()
+        return divs
+
+    def primes(self):
+        if self._primes is None:
+            if np is not None:
+                odd = (2 * np.flatnonzero(np.frombuffer(self.table, dtype=np.uint16)[1:] == 0) + 3).tolist()
+            else:
+                odd = [2 * k + 1 for k in range(1, len(self.table)) if not self.table[k]]
+            self._primes = [2] + [p for p in odd if p <= self.bound]
+        return self._primes
+
+    def _factorize_large(self, n):
+        if math.isqrt(n) > self.bound:
+            raise ValueError(f'{n} is too large for a sieve up to {self.bound}')
+        factors = {}
+        for p in self.primes():
+            if p * p > n:
+                break
+            while n % p == 0:
+                factors[p] = factors.get(p, 0) + 1
+                n //= p
+        if n > 1:
+            factors[n] = factors.get(n, 0) + 1
+        # a tuple, so the cached value cannot be changed by a caller
+        return tuple(factors.items())
+
+    def save(self, path):
+        with open(path, 'wb') as outfile:
+            outfile.write(HEADER.pack(MAGIC, self.bound))
+            outfile.write(memoryview(self.table).cast('B'))
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Memory-map a saved table: nothing is read until it is used, and processes share the pages"""
+        with open(path, 'rb') as infile:
+            mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, bound = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a divisor index')
+        table = memoryview(mapped)[HEADER.size:].cast('H')
+        return cls(bound, table, **kwargs)
+
+
+def build_table(bound):
+    """Smallest prime factor of every odd number up to `bound`, 0 for primes"""
+    if bound > MAX_BOUND:
+        raise ValueError(f'bound must be at most {MAX_BOUND}, not {bound}')
+    size = bound // 2 + 1
+    if np is not None:
+        table = np.zeros(size, dtype=np.uint16)
+        for p in range(3, math.isqrt(bound) + 1, 2):
+            if table[p // 2]:
+                continue
+            # odd multiples of p from p*p on; keep factors found by smaller primes
+            multiples = table[p * p // 2::p]
+            multiples[multiples == 0] = p
+        return table
+    table = array('H', bytes(2 * size))
+    for p in range(3, math.isqrt(bound) + 1, 2):
+        if table[p // 2]:
+            continue
+        for k in range(p * p // 2, size, p):
+            if not table[k]:
+                table[k] = p
+    return table
+
+
+def main():
+    from global_interpreter_lock import factorize
+
+    start = time()
+    index = DivisorIndex(10 ** 7)
+    print('Sieve up to 10**7 took %.3f seconds' % (time() - start))
+
+    numbers = [8402868, 2295738, 5938342, 7925426]
+    assert [index.divisors(n) for n in numbers] == [list(factorize(n)) for n in numbers]
+
+    start = time()
+    for n in range(10 ** 6, 2 * 10 ** 6):
+        index.divisors(n)
+    print('Divisors of 10**6 numbers took %.3f seconds' % (time() - start))
+
+    print(index.divisors(10 ** 12 + 39))  # above the bound: trial division, then cached
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from time import time
+
+from global_interpreter_lock import FactorizeThread, factorize
+
+
+NUMBERS = [8402868, 2295738, 5938342, 7925426]
+
+
+def divisors(number):
+    """Same result as list(factorize(number)), in O(sqrt(n)) steps
+
+    Divisors come in pairs i * (number // i), so it is enough to try i up to sqrt(number).
+    """
+    small, large = [], []
+    for i in range(1, math.isqrt(number) + 1):
+        if number % i == 0:
+            small.append(i)
+            if i != number // i:
+                large.append(number // i)
+    return small + large[::-1]
+
+
+def factorize_list(number):
+    # module level, so the process pool can pickle it
+    return list(factorize(number))
+
+
+def factorize_many(numbers, func=divisors, workers=None, chunksize=None):
+    """Factorize a batch of numbers in a process pool, one interpreter (and GIL) per core"""
+    numbers = list(numbers)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # a few chunks per worker: small enough to balance, large enough to amortize pickling
+        chunksize = max(1, len(numbers) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, numbers, chunksize=chunksize))
+
+
+def run_serial(numbers, func):
+    return [func(number) for number in numbers]
+
+
+def run_threaded(numbers):
+    threads = [FactorizeThread(number) for number in numbers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [thread.factors for thread in threads]
+
+
+def compare(numbers=NUMBERS, workers=None):
+    """Time the same work serially, with threads and with processes"""
+    expected = run_serial(numbers, divisors)
+    runs = [
+        ('serial O(n)', lambda: run_serial(numbers, factorize_list)),
+        ('threaded O(n)', lambda: run_threaded(numbers)),
+        ('processes O(n)', lambda: factorize_many(numbers, factorize_list, workers)),
+        ('serial O(sqrt n)', lambda: run_serial(numbers, divisors)),
+        ('processes O(sqrt n)', lambda: factorize_many(numbers, divisors, workers)),
+    ]
+    for name, run in runs:
+        start = time()
+        result = run()
+        end = time()
+        assert result == expected
+        print('%-20s took %.3f seconds' % (name, end - start))
+
+
+def main():
+    print('%d CPUs' % (os.cpu_count() or 1))
+    compare()
+    # a larger batch, where only the O(sqrt n) algorithm is practical
+    batch = [10 ** 10 + i for i in range(200)]
+    for name, run in [('serial O(sqrt n)', lambda: run_serial(batch, divisors)),
+                      ('processes O(sqrt n)', lambda: factorize_many(batch))]:
+        start = time()
+        run()
+        print('%-20s took %.3f seconds for %d numbers near 10**10' % (name, time() - start, len(batch)))
+
+
+if __name__ == '__main__':
+    main()
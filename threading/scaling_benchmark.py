@@ -0,0 +1,199 @@
+import concurrent.futures as cf
+import datetime
+import functools
+import json
+import os
+import platform
+import sys
+import sysconfig
+import time
+
+from counters import ShardedCounter
+from factorize_pool import factorize_list
+from sensor_pool import read_sensors
+from thread_lock import LockingCounter, worker
+
+
+# Every workload is split into the same number of tasks, whatever the number of workers,
+# so the total work is fixed and the ideal speedup with n workers is n.
+TASKS = 16
+
+# A workload makes (func, tasks, result) for a size: result() turns the outputs
+# of func over the tasks into what must be the same on every backend.
+# It is made again for every run, so state like a counter starts from scratch.
+
+def make_factorize(size):
+    return factorize_list, [size + i for i in range(TASKS)], list
+
+
+def make_sensor_batches(size):
+    # counts in a local variable per batch: no shared state at all
+    return read_sensors, [[(i, size)] for i in range(TASKS)], list
+
+
+def _increment(counter, items):
+    worker(0, items, counter)
+
+
+def make_counter(counter_class, size):
+    """thread_lock.worker() on one counter shared by all the tasks"""
+    counter = counter_class()
+    return functools.partial(_increment, counter), [size] * TASKS, lambda outputs: counter.count
+
+
+# name: (make, sizes, backends); a shared counter only exists within one process,
+# so the counter workloads run serially and on threads only
+WORKLOADS = {
+    'factorize': (make_factorize, [200000, 1000000], None),
+    'sensor_batches': (make_sensor_batches, [200000, 1000000], None),
+    'locking_counter': (functools.partial(make_counter, LockingCounter), [20000, 100000], ['serial', 'threads']),
+    'sharded_counter': (functools.partial(make_counter, ShardedCounter), [20000, 100000], ['serial', 'threads']),
+}
+
+
+def gil_enabled():
+    """False only on a free-threaded build running without the GIL"""
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_enabled is None else is_enabled()
+
+
+def free_threaded_build():
+    return bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+
+
+def _serial(workers):
+    # runs in the calling thread, `workers` is ignored
+    return None
+
+
+BACKENDS = {
+    'serial': _serial,
+    'threads': cf.ThreadPoolExecutor,
+    'processes': cf.ProcessPoolExecutor,
+}
+# Python 3.14+: one subinterpreter (with its own GIL) per worker, in the same process
+if hasattr(cf, 'InterpreterPoolExecutor'):
+    BACKENDS['interpreters'] = cf.InterpreterPoolExecutor
+
+
+def metadata():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'free_threaded_build': free_threaded_build(),
+        'gil_enabled': gil_enabled(),
+        'backends': list(BACKENDS),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def time_run(backend, workers, make, size, repeat=3):
+    """Best wall-clock time of `repeat` runs, and the result; the pool is started outside the timing"""
+    best = float('inf')
+    for _ in range(repeat):
+        func, tasks, result = make(size)
+        executor = BACKENDS[backend](workers)
+        try:
+            if executor is not None:
+                # start the workers, so that only the work itself is timed
+                list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            outputs = list(map(func, tasks) if executor is None else executor.map(func, tasks))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return best, result(outputs)
+
+
+def worker_counts(cpus=None):
+    """1, 2, 4, ... up to twice the number of CPUs"""
+    cpus = cpus or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] < 2 * cpus:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def run_suite(workloads=WORKLOADS, backends=None, workers=None, repeat=3, log=print):
+    """Run every workload, size, backend and worker count, return the results as a dict"""
+    backends = backends or list(BACKENDS)
+    workers = workers or worker_counts()
+    results = []
+    for workload, (make, sizes, supported) in workloads.items():
+        for size in sizes:
+            serial = None
+            for backend in backends:
+                if supported is not None and backend not in supported:
+                    continue
+                for count in ([1] if backend == 'serial' else workers):
+                    elapsed, output = time_run(backend, count, make, size, repeat)
+                    if serial is None:
+                        serial, expected = elapsed, output
+                    elif output != expected:
+                        raise RuntimeError(f'{backend} with {count} workers gave a different result')
+                    result = dict(workload=workload, size=size, backend=backend, workers=count,
+                                  seconds=elapsed, speedup=serial / elapsed)
+                    results.append(result)
+                    if log:
+                        log('{workload:<16} {size:>8} {backend:<12} {workers:>3} workers '
+                            '{seconds:8.3f} secs speedup {speedup:5.2f}'.format(**result))
+    return {'metadata': metadata(), 'results': results}
+
+
+def _key(result):
+    return result['workload'], result['size'], result['backend'], result['workers']
+
+
+def compare(report, baseline, threshold=0.2):
+    """Results more than `threshold` (a fraction) slower than the baseline, as (key, old, new)
+
+    Only comparable with a baseline from the same machine and Python build.
+    """
+    old = {_key(result): result['seconds'] for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        before = old.get(_key(result))
+        if before is not None and result['seconds'] > before * (1 + threshold):
+            regressions.append((_key(result), before, result['seconds']))
+    return regressions
+
+
+def save(report, path):
+    with open(path, 'w') as outfile:
+        json.dump(report, outfile, indent=2)
+
+
+def load(path):
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def main(results_path='scaling_results.json', baseline_path='scaling_baseline.json'):
+    info = metadata()
+    print('Python {python} ({implementation}), free-threaded build: {free_threaded_build}, '
+          'GIL enabled: {gil_enabled}, {cpu_count} CPUs, backends: {backends}'.format(**info))
+    report = run_suite()
+    save(report, results_path)
+    print('Results written to', results_path)
+
+    if not os.path.exists(baseline_path):
+        save(report, baseline_path)
+        print('No baseline yet, saved these results as', baseline_path)
+        return
+    baseline = load(baseline_path)
+    if baseline['metadata']['python'] != info['python'] or baseline['metadata']['machine'] != info['machine']:
+        print('Warning: the baseline was recorded with a different Python or machine')
+    regressions = compare(report, baseline)
+    for (workload, size, backend, workers), before, after in regressions:
+        print(f'REGRESSION {workload} {size} {backend} {workers} workers: {before:.3f} -> {after:.3f} secs')
+    if not regressions:
+        print('No regressions against', baseline_path)
+
+
+if __name__ == '__main__':
+    main()
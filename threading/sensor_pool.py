@@ -0,0 +1,216 @@
+import multiprocessing
+import operator
+import os
+import pickle
+import queue
+import threading
+import time
+
+from thread_lock import LockingCounter, run_threads, worker
+
+
+def read_sensors(batch):
+    """Process a batch of (sensor_idx, items) pairs, return the number of items read
+
+    The per-item work of thread_lock.worker(), but counted in a local variable:
+    nothing is shared until the batch is done.
+    """
+    count = 0
+    for sensor_idx, items in batch:
+        for _ in range(items):
+            # Read from the sensor
+            # ...
+            count += 1
+    return count
+
+
+def make_batches(sensors, items, batch_size=100):
+    """Group `sensors` sensors with `items` items each into batches of `batch_size` sensors"""
+    for start in range(0, sensors, batch_size):
+        yield [(sensor_idx, items) for sensor_idx in range(start, min(start + batch_size, sensors))]
+
+
+class WorkerStats:
+    """What one worker of a SensorPool did"""
+    def __init__(self, index):
+        self.index = index
+        self.batches = 0
+        self.items = 0
+        self.busy = 0.    # time spent processing batches
+        self.idle = 0.    # time spent waiting for the queue
+
+    @property
+    def throughput(self):
+        return self.items / self.busy if self.busy else 0.
+
+    def __str__(self):
+        return ('worker {0.index:<3} {0.batches:>6} batches {0.items:>10} items '
+                '{0.throughput:>12.0f} items/s busy {0.busy:.3f}s idle {0.idle:.3f}s').format(self)
+
+
+class PoolStats:
+    """Stats of one SensorPool.run(): the workers and the depth of the queue"""
+    def __init__(self, workers):
+        self.workers = workers
+        self.elapsed = 0.
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._samples = 0
+
+    def sample_depth(self, depth):
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self._samples += 1
+
+    @property
+    def mean_depth(self):
+        return self._depth_sum / self._samples if self._samples else 0.
+
+    @property
+    def items(self):
+        return sum(stats.items for stats in self.workers)
+
+    def __str__(self):
+        lines = ['{} items in {:.3f} secs, {:.0f} items/s, queue depth mean {:.1f} max {}'.format(
+            self.items, self.elapsed, self.items / self.elapsed if self.elapsed else 0.,
+            self.mean_depth, self.max_depth)]
+        lines += ['    ' + str(stats) for stats in self.workers]
+        return '\n'.join(lines)
+
+
+def _work(index, func, count, merge, tasks, results):
+    """Worker loop: accumulate func(batch) locally, report once when the queue is done
+
+    After an error the worker keeps taking batches off the queue without
+    processing them, so the producer never blocks on a full queue, and
+    reports the error instead of a result.
+    """
+    stats = WorkerStats(index)
+    partial = None
+    error = None
+    clock = time.perf_counter
+    while True:
+        start = clock()
+        batch = tasks.get()
+        got = clock()
+        stats.idle += got - start
+        if batch is None:
+            break
+        if error is not None:
+            continue
+        try:
+            result = func(batch)
+            partial = result if partial is None else merge(partial, result)
+        except Exception as e:
+            error = e
+            continue
+        stats.busy += clock() - got
+        stats.batches += 1
+        stats.items += count(batch)
+    if error is not None and not isinstance(results, queue.Queue):
+        # an exception that cannot be pickled would never reach the parent process
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(f'worker {index} failed: {error!r}')
+    results.put((index, partial, stats, error))
+
+
+def _count_items(batch):
+    return sum(items for _, items in batch)
+
+
+# Backends: (queue factory, worker factory)
+BACKENDS = {
+    'thread': (queue.Queue, threading.Thread),
+    'process': (multiprocessing.Queue, multiprocessing.Process),
+}
+
+
+class SensorPool:
+    """Fixed pool of workers fed by a bounded queue of sensor batches
+
+    Instead of one thread per sensor, each incrementing a shared counter
+    under a lock for every item, a few workers take whole batches from a
+    queue and accumulate the results locally. The partial results are merged
+    once, at the end. The queue holds at most `maxsize` batches, so a fast
+    producer waits for the workers instead of buffering every batch in memory.
+
+    With the 'process' backend `func`, `merge` and `count` must be picklable
+    (module level functions), and every worker has its own interpreter and GIL.
+    """
+    def __init__(self, func=read_sensors, workers=None, backend='thread', maxsize=None,
+                 merge=operator.add, count=_count_items, initial=0):
+        if backend not in BACKENDS:
+            raise ValueError(f'unknown backend {backend!r}, expected one of {sorted(BACKENDS)}')
+        self.func = func
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.maxsize = maxsize or 4 * self.workers
+        self.merge = merge
+        self.count = count
+        self.initial = initial   # the result when there are no batches
+
+    def run(self, batches):
+        """Process all `batches`, return (merged result, PoolStats)
+
+        If `func` or `merge` raised in a worker, the first error is raised
+        here, once all the workers have finished.
+        """
+        make_queue, make_worker = BACKENDS[self.backend]
+        tasks, results = make_queue(self.maxsize), make_queue()
+        stats = PoolStats([])
+        start = time.perf_counter()
+        workers = [make_worker(target=_work, args=(i, self.func, self.count, self.merge, tasks, results))
+                   for i in range(self.workers)]
+        for w in workers:
+            w.start()
+        try:
+            for batch in batches:
+                tasks.put(batch)
+                stats.sample_depth(self._depth(tasks))
+        finally:
+            # one sentinel per worker, even if producing the batches failed
+            for _ in workers:
+                tasks.put(None)
+        reports = sorted((results.get() for _ in workers), key=operator.itemgetter(0))
+        for w in workers:
+            w.join()
+        stats.elapsed = time.perf_counter() - start
+
+        errors = [error for _, _, _, error in reports if error is not None]
+        if errors:
+            raise errors[0]
+        total = self.initial
+        for _, partial, worker_stats, _ in reports:
+            stats.workers.append(worker_stats)
+            if partial is not None:
+                total = self.merge(total, partial)
+        return total, stats
+
+    @staticmethod
+    def _depth(tasks):
+        try:
+            return tasks.qsize()
+        except NotImplementedError:   # multiprocessing.Queue on macOS
+            return 0
+
+
+def main():
+    sensors, items = 5000, 200
+
+    start = time.perf_counter()
+    counter = LockingCounter()
+    # thread_lock.run_threads() starts five threads, so read the sensors in five groups
+    run_threads(worker, sensors * items // 5, counter)
+    print('run_threads with a LockingCounter: {} items in {:.3f} secs'.format(
+        counter.count, time.perf_counter() - start))
+
+    for backend in BACKENDS:
+        total, stats = SensorPool(workers=4, backend=backend).run(make_batches(sensors, items))
+        assert total == sensors * items
+        print(f'SensorPool, {backend} backend:', stats)
+
+
+if __name__ == '__main__':
+    main()
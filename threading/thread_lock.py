@@ -7,8 +7,8 @@ class Counter:
     def __init__(self):
         self.count = 0
 
-    def increment(self):
-        self.count += 1
+    def increment(self, n=1):
+        self.count += n
 
 
 #  By using a lock, we can have the Counter class protect
@@ -18,11 +18,11 @@ class LockingCounter:
         self.lock = threading.Lock()
         self.count = 0
 
-    def increment(self):
+    def increment(self, n=1):
         # here we use with statement to acquire and release the lock
         # this make it easier to see which code is executing while the lock is held
         with self.lock:
-            self.count += 1
+            self.count += n
 
 
 # Each sensors has its own worker thread for processing items